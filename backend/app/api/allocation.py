@@ -1,16 +1,49 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from app.models.schemas import AllocationRequest, AllocationResponse, PersonAllocation
+from app.models.internal import Item, Participant, Rule
 from app.services.allocation_service import AllocationService
+from app.services.currency_service import CurrencyService
+from app.services.response_encoding import render_allocation, wants_msgpack
 from decimal import Decimal
 
 router = APIRouter()
 allocation_service = AllocationService()
+currency_service = CurrencyService()
 
 @router.post("/calculate", response_model=AllocationResponse)
-async def calculate_allocation(request: AllocationRequest):
+async def calculate_allocation(request: AllocationRequest, http_request: Request, format: str = "json", shape: str = "rows"):
     """
-    Calculate bill splits based on items, people, and allocation rules
+    Calculate bill splits based on items, people, and allocation rules.
+    
+    Pass format=msgpack (or Accept: application/msgpack) for a MessagePack body
+    and shape=columnar to list item metadata once instead of per person.
     """
+    response = await build_allocation_response(request)
+    accept = http_request.headers.get("accept", "")
+    if shape == "rows" and format == "json" and not wants_msgpack(accept, format):
+        return response
+    try:
+        return render_allocation(response, accept=accept, format=format, shape=shape)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def build_allocation_response(request: AllocationRequest) -> AllocationResponse:
+    """
+    Run the allocation for a request and build the response model
+    """
+    # The request was validated once on the way in; from here on use compact records
+    items = [Item.from_model(item) for item in request.items]
+    people = [Participant(person.id, person.name) for person in request.people]
+    rules = [Rule.from_model(rule) for rule in request.rules]
+    
+    # Convert every item and the grand total into the settlement currency in one pass
+    currency = request.currency.upper()
+    settlement_currency = (request.settlement_currency or currency).upper()
+    try:
+        grand_total = currency_service.convert_items(items, float(request.grand_total), currency, settlement_currency)
+    except (ValueError, OSError) as e:
+        raise HTTPException(status_code=400, detail=f"Currency conversion failed: {str(e)}")
+    
     try:
         # Debug: Log the request data
         print(f"🔍 Allocation Request:")
@@ -21,39 +54,39 @@ async def calculate_allocation(request: AllocationRequest):
         print(f"  Tip Rate: {request.tip_rate}")
         print(f"  Grand Total: {request.grand_total}")
         
-        # Convert Pydantic models to service format
-        items = [item.dict() for item in request.items]
-        people = [person.dict() for person in request.people]
-        rules = [rule.dict() for rule in request.rules]
-        
         # Calculate allocations
-        result = allocation_service.calculate_allocations(
+        result = allocation_service.allocate(
             items=items,
             people=people,
             rules=rules,
             tax_rate=request.tax_rate,
             tip_rate=request.tip_rate,
-            grand_total=float(request.grand_total)
+            grand_total=grand_total,
+            currency=settlement_currency
         )
+        currency_service.add_original_totals(result.allocations, settlement_currency)
         
-        # Convert results to response format
+        # Convert results to response format; the values are already valid
         allocations = []
-        for allocation in result['allocations']:
-            allocations.append(PersonAllocation(
-                person_id=allocation['person_id'],
-                person_name=allocation['person_name'],
-                items=allocation['items'],
-                subtotal=Decimal(str(allocation['subtotal'])),
-                tax_share=Decimal(str(allocation['tax_share'])),
-                tip_share=Decimal(str(allocation['tip_share'])),
-                total=Decimal(str(allocation['total']))
+        for allocation in result.allocations:
+            allocations.append(PersonAllocation.model_construct(
+                person_id=allocation.person_id,
+                person_name=allocation.person_name,
+                items=[share.to_dict(with_original=True) for share in allocation.shares],
+                subtotal=Decimal(str(allocation.subtotal)),
+                tax_share=Decimal(str(allocation.tax_share)),
+                tip_share=Decimal(str(allocation.tip_share)),
+                total=Decimal(str(allocation.total)),
+                currency=allocation.currency,
+                original_totals=allocation.original_totals
             ))
         
-        return AllocationResponse(
+        return AllocationResponse.model_construct(
             allocations=allocations,
-            total_calculated=Decimal(str(result['total_calculated'])),
-            total_expected=request.grand_total,
-            difference=Decimal(str(result['difference']))
+            total_calculated=Decimal(str(result.total_calculated)),
+            total_expected=request.grand_total if settlement_currency == currency else Decimal(str(grand_total)),
+            difference=Decimal(str(result.difference)),
+            currency=settlement_currency
         )
     
     except Exception as e:
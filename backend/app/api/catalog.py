@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException, BackgroundTasks
+from typing import List
+from app.models.schemas import BillItem, CatalogLearnResponse
+from app.services.catalog_service import CatalogService
+
+router = APIRouter()
+catalog_service = CatalogService()
+
+@router.post("/{merchant}/items", response_model=CatalogLearnResponse)
+async def learn_items(merchant: str, items: List[BillItem], background_tasks: BackgroundTasks):
+    """
+    Teach the merchant catalog from items the user confirmed
+    """
+    try:
+        learned = catalog_service.learn(merchant, [item.dict() for item in items])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Merging into the on-disk index happens after the response
+    background_tasks.add_task(catalog_service.flush_if_needed)
+    return CatalogLearnResponse(merchant=merchant, learned=learned)
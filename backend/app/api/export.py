@@ -0,0 +1,40 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.services.export_service import ExportService, EXPORT_FORMATS
+from app.api.ledger import bill_store
+
+router = APIRouter()
+export_service = ExportService(bill_store)
+
+@router.get("/allocations")
+async def export_allocations(
+    format: str = "csv",
+    group_id: Optional[str] = None,
+    month: Optional[str] = Query(default=None, pattern=r"^\d{4}-\d{2}$"),
+    after: int = Query(default=0, ge=0, description="Resume after this bill_seq"),
+    limit: Optional[int] = Query(default=None, ge=1, description="Maximum number of bills"),
+    chunk_size: int = Query(default=500, ge=1, le=10000)
+):
+    """
+    Stream per-person allocations for many bills as CSV, NDJSON or Parquet.
+    
+    Bills are read and allocated chunk by chunk, so memory stays constant.
+    Every row carries its bill_seq; pass the last one seen as `after` to
+    resume an interrupted export. A bill that cannot be allocated is
+    exported as one row with only its bill columns and `error` set.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of: {', '.join(EXPORT_FORMATS)}")
+    try:
+        body = export_service.stream(format, after=after, limit=limit, group_id=group_id,
+                                     month=month, chunk_size=chunk_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filename = f"allocations-{month or 'all'}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
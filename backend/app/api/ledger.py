@@ -0,0 +1,79 @@
+from fastapi import APIRouter, HTTPException
+from app.models.schemas import GroupBillRequest, GroupBillResponse, GroupBalancesResponse, Settlement
+from app.services.ledger_service import LedgerService
+from app.services.bill_store import BillStore
+from app.api.allocation import build_allocation_response
+import uuid
+
+router = APIRouter()
+ledger_service = LedgerService()
+bill_store = BillStore()
+
+async def _record_bill(group_id: str, bill_id: str, request: GroupBillRequest) -> GroupBillResponse:
+    # A group settles in one currency: later bills are converted into the first bill's
+    allocation_request = request.allocation
+    group_currency = ledger_service.group_currency(group_id)
+    if group_currency:
+        requested = allocation_request.settlement_currency
+        if requested and requested.upper() != group_currency:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Group {group_id} settles in {group_currency}, not {requested.upper()}"
+            )
+        allocation_request = allocation_request.model_copy(update={'settlement_currency': group_currency})
+
+    allocation = await build_allocation_response(allocation_request)
+    try:
+        entry = ledger_service.record_bill(
+            group_id=group_id,
+            bill_id=bill_id,
+            paid_by=request.paid_by,
+            allocations=[a.dict() for a in allocation.allocations],
+            currency=allocation.currency
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    bill_store.put(group_id, bill_id, request.paid_by, allocation_request)
+    return GroupBillResponse(bill_id=bill_id, seq=entry.seq, allocation=allocation)
+
+@router.post("/{group_id}/bills", response_model=GroupBillResponse)
+async def add_bill(group_id: str, request: GroupBillRequest):
+    """
+    Calculate a bill and add it to the group ledger
+    """
+    return await _record_bill(group_id, str(uuid.uuid4()), request)
+
+@router.put("/{group_id}/bills/{bill_id}", response_model=GroupBillResponse)
+async def edit_bill(group_id: str, bill_id: str, request: GroupBillRequest):
+    """
+    Recalculate a bill and replace its effect on the group balances
+    """
+    return await _record_bill(group_id, bill_id, request)
+
+@router.delete("/{group_id}/bills/{bill_id}")
+async def delete_bill(group_id: str, bill_id: str):
+    """
+    Remove a bill from the group balances
+    """
+    try:
+        entry = ledger_service.delete_bill(group_id, bill_id)
+        bill_store.delete(group_id, bill_id)
+        return {"bill_id": bill_id, "seq": entry.seq}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/{group_id}/balances", response_model=GroupBalancesResponse)
+async def get_balances(group_id: str):
+    """
+    Who owes whom overall, served from the materialized balances
+    """
+    return GroupBalancesResponse(
+        group_id=group_id,
+        currency=ledger_service.group_currency(group_id),
+        balances=ledger_service.get_balances(group_id),
+        settlements=[
+            Settlement(from_person_id=debtor, to_person_id=creditor, amount=amount)
+            for debtor, creditor, amount in ledger_service.get_settlements(group_id)
+        ],
+        entry_count=ledger_service.entry_count(group_id)
+    )
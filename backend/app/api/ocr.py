@@ -1,15 +1,28 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.models.schemas import OCRResponse, BillItem
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
+from typing import Optional
+from app.models.schemas import OCRResponse
 from app.services.ocr_service import OCRService
+from app.services.receipt_parser import parse_receipt_text
+from app.api.uploads import image_storage
+from app.api.catalog import catalog_service
 import uuid
 
 router = APIRouter()
 ocr_service = OCRService()
 
 @router.post("/extract", response_model=OCRResponse)
-async def extract_text_from_image(file: UploadFile = File(...)):
+async def extract_text_from_image(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    merchant: Optional[str] = Form(None),
+    text: Optional[str] = Form(None)
+):
     """
-    Extract text and items from a receipt image using OCR
+    Extract text and items from a receipt image using OCR.
+    
+    With a merchant, items are checked against that merchant's catalog. If the
+    client also sends receipt text it read on-device and every parsed item is a
+    known catalog entry, the vision model is skipped.
     """
     # Debug: Log file information
     print(f"🔍 Received file: {file.filename}")
@@ -21,24 +34,42 @@ async def extract_text_from_image(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="File must be an image")
     
     try:
+        # Store the upload once under its content hash; resizing and eviction run after the response
+        image_hash = image_storage.save(await file.read())
+        await file.seek(0)
+        background_tasks.add_task(image_storage.process_upload, image_hash)
+        
+        # A local parse the catalog fully recognizes needs no remote call
+        source = "vision"
+        result = None
+        if merchant and text:
+            parsed = parse_receipt_text(text)
+            if catalog_service.is_confident(merchant, parsed):
+                print(f"✅ Local parse matched the {merchant} catalog, skipping vision model")
+                result = {'text': text, 'confidence': 0.9, 'items': parsed['items']}
+                source = "local"
+        
         # Process the image with OCR
-        result = await ocr_service.extract_text(file)
+        if result is None:
+            result = await ocr_service.extract_text(file)
         
-        # Convert items to BillItem models
-        items = []
+        # Assign ids in place; the response model validates the items once
         for item in result['items']:
-            items.append(BillItem(
-                id=str(uuid.uuid4()),
-                name=item['name'],
-                quantity=item['quantity'],
-                price=item['price'],
-                is_taxable=item['is_taxable']
-            ))
+            item['id'] = str(uuid.uuid4())
+        
+        # Snap names and prices to the merchant's known items
+        catalog_flags = catalog_service.apply(merchant, result['items']) if merchant else []
         
         return OCRResponse(
             text=result['text'],
             confidence=result['confidence'],
-            items=items
+            items=result['items'],
+            source=source,
+            catalog_flags=catalog_flags,
+            image_hash=image_hash,
+            image_url=f"/uploads/{image_hash}",
+            thumbnail_url=f"/uploads/{image_hash}?size=thumb",
+            preview_url=f"/uploads/{image_hash}?size=preview"
         )
     
     except Exception as e:
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from app.services.bill_session_service import BillSessionService
+from app.services.pubsub import RESYNC_MESSAGE
+import asyncio
+
+router = APIRouter()
+bill_session_service = BillSessionService()
+
+async def _forward_updates(websocket: WebSocket, bill_id: str, queue: asyncio.Queue):
+    while True:
+        message = await queue.get()
+        if message == RESYNC_MESSAGE:
+            await websocket.send_json(bill_session_service.get_session(bill_id).snapshot())
+        else:
+            await websocket.send_text(message)
+
+async def _receive_ops(websocket: WebSocket, bill_id: str):
+    while True:
+        data = await websocket.receive_json()
+        try:
+            await bill_session_service.apply_ops(bill_id, data.get('ops', []))
+        except Exception as e:
+            await websocket.send_json({"type": "error", "detail": f"Edit rejected: {str(e)}"})
+
+@router.websocket("/bills/{bill_id}")
+async def bill_session(websocket: WebSocket, bill_id: str):
+    """
+    Collaborative bill editing.
+
+    Clients send {"ops": [...]} with small edit operations and receive a
+    snapshot on connect, then a delta with only the changed allocations
+    after every accepted edit.
+    """
+    await websocket.accept()
+    hub = bill_session_service.hub
+    queue = hub.subscribe(bill_id)
+    await websocket.send_json(bill_session_service.get_session(bill_id).snapshot())
+
+    tasks = [
+        asyncio.create_task(_forward_updates(websocket, bill_id, queue)),
+        asyncio.create_task(_receive_ops(websocket, bill_id)),
+    ]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc and not isinstance(exc, WebSocketDisconnect):
+                print(f"❌ Bill session error: {str(exc)}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        hub.unsubscribe(bill_id, queue)
+        # Sessions live only while someone is connected
+        bill_session_service.release_session(bill_id)
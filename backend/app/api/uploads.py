@@ -0,0 +1,77 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from app.services.image_storage import ImageStorageService
+import os
+import re
+
+router = APIRouter()
+image_storage = ImageStorageService()
+
+# Stored files never change, so clients and proxies may cache them forever
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+def _iter_file(path: str, start: int, length: int):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+@router.get("/{image_hash}")
+async def get_upload(image_hash: str, request: Request, size: str = "original"):
+    """
+    Serve a stored receipt image with immutable caching, ETags and byte ranges
+    """
+    if size != "original" and size not in ("thumb", "preview"):
+        raise HTTPException(status_code=400, detail="Size must be original, thumb or preview")
+
+    resolved = image_storage.resolve(image_hash, size)
+    if not resolved:
+        raise HTTPException(status_code=404, detail="Image not found")
+    path, content_type = resolved
+
+    # The variant may still be generating, so the ETag names what is actually served
+    variant = size if path.endswith(f".{size}") else "original"
+    etag = f'"{image_hash}-{variant}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    if variant != size:
+        # Do not let the fallback be cached as the requested size
+        headers["Cache-Control"] = "no-cache"
+
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    file_size = os.path.getsize(path)
+    range_header = request.headers.get("range")
+    if range_header:
+        match = RANGE_RE.match(range_header.strip())
+        start, end = None, None
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = int(match.group(2)) if match.group(2) else file_size - 1
+            else:
+                start = max(file_size - int(match.group(2)), 0)
+                end = file_size - 1
+            end = min(end, file_size - 1)
+        if start is None or start > end:
+            headers["Content-Range"] = f"bytes */{file_size}"
+            return Response(status_code=416, headers=headers)
+
+        length = end - start + 1
+        headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+        headers["Content-Length"] = str(length)
+        return StreamingResponse(_iter_file(path, start, length), status_code=206,
+                                 media_type=content_type, headers=headers)
+
+    headers["Content-Length"] = str(file_size)
+    return StreamingResponse(_iter_file(path, 0, file_size), media_type=content_type, headers=headers)
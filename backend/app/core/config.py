@@ -8,6 +8,24 @@ class Settings(BaseSettings):
     
     # OpenAI Settings
     OPENAI_API_KEY: str = "OPENAI_API_KEY"
+    OCR_MAX_TOKENS: int = 1000
+    # Concurrent vision calls across all requests (a tall receipt uses up to 8)
+    OCR_MAX_WORKERS: int = 32
+    
+    # Upload Storage Settings
+    UPLOAD_DIR: str = "uploads"
+    UPLOAD_MAX_BYTES: int = 500 * 1024 * 1024
+    
+    # Merchant Catalog Settings
+    CATALOG_DIR: str = "catalog"
+    CATALOG_FLUSH_SIZE: int = 1000
+    
+    # Response Compression Settings
+    COMPRESSION_MIN_SIZE: int = 1024
+    
+    # Currency Settings
+    EXCHANGE_RATES_FILE: str = ""
+    EXCHANGE_RATES_TTL: int = 3600
     
     class Config:
         env_file = ".env"
@@ -21,7 +39,7 @@ settings = Settings()
 ALLOWED_ORIGINS_LIST = [origin.strip() for origin in settings.ALLOWED_ORIGINS.split(",")]
 
 # Create uploads directory if it doesn't exist
-os.makedirs("uploads", exist_ok=True)
+os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 
 # Debug: Print environment variable loading status
 print(f"Config: OPENAI_API_KEY = {'Set' if settings.OPENAI_API_KEY and settings.OPENAI_API_KEY != 'OPENAI_API_KEY' else 'Not Set'}")
@@ -1,10 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import uvicorn
 
-from app.api import ocr, allocation, health
+from app.api import ocr, allocation, health, ledger, uploads, sessions, export, catalog
 from app.core.config import settings, ALLOWED_ORIGINS_LIST
+from app.core.compression import CompressionMiddleware
 
 app = FastAPI(
     title="Smart Split API",
@@ -23,13 +23,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated brotli/gzip compression for large responses
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
 # Include API routes
 app.include_router(health.router, prefix="/api", tags=["health"])
 app.include_router(ocr.router, prefix="/api/ocr", tags=["ocr"])
+app.include_router(catalog.router, prefix="/api/catalog", tags=["catalog"])
 app.include_router(allocation.router, prefix="/api/allocation", tags=["allocation"])
-
-# Mount static files for uploaded images
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.include_router(ledger.router, prefix="/api/groups", tags=["ledger"])
+app.include_router(export.router, prefix="/api/export", tags=["export"])
+app.include_router(sessions.router, prefix="/ws", tags=["sessions"])
+app.include_router(uploads.router, prefix="/uploads", tags=["uploads"])
 
 @app.get("/")
 async def root():
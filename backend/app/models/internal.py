@@ -0,0 +1,137 @@
+"""
+Compact typed records shared from OCR through allocation.
+
+Requests are validated once by the Pydantic models in schemas.py and then
+converted to these slotted records. Shares reference their Item instead of
+copying its fields, and nothing goes back to dicts until the response.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+
+
+@dataclass
+class Item:
+    __slots__ = ('id', 'name', 'quantity', 'price', 'is_taxable', 'currency',
+                 'original_price', 'original_currency')
+    id: str
+    name: str
+    quantity: float
+    price: float
+    is_taxable: bool
+    currency: Optional[str]
+    # Price and currency as charged, before conversion to the settlement currency
+    original_price: float
+    original_currency: Optional[str]
+
+    @classmethod
+    def create(cls, id: str, name: str, quantity: float, price: float, is_taxable: bool = True,
+               currency: Optional[str] = None) -> 'Item':
+        price = float(price)
+        return cls(id, name, float(quantity), price, is_taxable, currency, price, currency)
+
+    @classmethod
+    def from_model(cls, model: Any) -> 'Item':
+        return cls.create(model.id, model.name, model.quantity, model.price, model.is_taxable, model.currency)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Item':
+        return cls.create(data['id'], data['name'], data['quantity'], data['price'],
+                          data.get('is_taxable', True), data.get('currency'))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'quantity': self.quantity,
+            'price': self.price,
+            'is_taxable': self.is_taxable,
+            'currency': self.currency
+        }
+
+
+@dataclass
+class Participant:
+    __slots__ = ('id', 'name')
+    id: str
+    name: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'id': self.id, 'name': self.name}
+
+
+@dataclass
+class Rule:
+    __slots__ = ('type', 'person_id', 'person_name', 'item_name', 'quantity')
+    type: str
+    person_id: Optional[str]
+    person_name: Optional[str]
+    item_name: Optional[str]
+    quantity: Optional[float]
+
+    @classmethod
+    def from_model(cls, model: Any) -> 'Rule':
+        return cls(model.type, model.person_id, None, model.item_name, model.quantity)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Rule':
+        return cls(data['type'], data.get('person_id'), data.get('person_name'),
+                   data.get('item_name'), data.get('quantity'))
+
+
+@dataclass
+class Share:
+    __slots__ = ('item', 'quantity', 'subtotal')
+    item: Item
+    quantity: float
+    subtotal: float
+
+    def to_dict(self, with_original: bool = False) -> Dict[str, Any]:
+        data = {
+            'item_id': self.item.id,
+            'item_name': self.item.name,
+            'quantity': self.quantity,
+            'price': self.item.price,
+            'subtotal': self.subtotal
+        }
+        if with_original:
+            data['original_currency'] = self.item.original_currency
+            data['original_price'] = self.item.original_price
+        return data
+
+
+@dataclass
+class PersonResult:
+    __slots__ = ('person_id', 'person_name', 'shares', 'subtotal', 'tax_share', 'tip_share', 'total',
+                 'currency', 'original_totals')
+    person_id: str
+    person_name: str
+    shares: List[Share]
+    subtotal: float
+    tax_share: float
+    tip_share: float
+    total: float
+    currency: Optional[str]
+    original_totals: Dict[str, Any]
+
+    @classmethod
+    def create(cls, person: Participant) -> 'PersonResult':
+        return cls(person.id, person.name, [], 0.0, 0.0, 0.0, 0.0, None, {})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'person_id': self.person_id,
+            'person_name': self.person_name,
+            'items': [share.to_dict() for share in self.shares],
+            'subtotal': self.subtotal,
+            'tax_share': self.tax_share,
+            'tip_share': self.tip_share,
+            'total': self.total
+        }
+
+
+@dataclass
+class AllocationResult:
+    __slots__ = ('allocations', 'total_calculated', 'difference')
+    allocations: List[PersonResult]
+    total_calculated: float
+    difference: float
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from decimal import Decimal
 
 class BillItem(BaseModel):
@@ -8,6 +8,7 @@ class BillItem(BaseModel):
     quantity: float
     price: Decimal
     is_taxable: bool = True
+    currency: Optional[str] = Field(default=None, description="ISO 4217 code; defaults to the bill currency")
 
 class Person(BaseModel):
     id: str
@@ -29,14 +30,30 @@ class PersonAllocation(BaseModel):
     tax_share: Decimal
     tip_share: Decimal
     total: Decimal
+    currency: Optional[str] = None
+    original_totals: Dict[str, Decimal] = Field(default_factory=dict)
 
 class OCRRequest(BaseModel):
     image_url: Optional[str] = None
 
+class CatalogFlag(BaseModel):
+    item_id: Optional[str] = None
+    status: str = Field(..., description="name_corrected, price_misread or price_changed")
+    ocr_name: str
+    ocr_price: Decimal
+    suggested_name: str
+    suggested_price: Optional[Decimal] = None
+
 class OCRResponse(BaseModel):
     text: str
     confidence: float
     items: List[BillItem]
+    source: str = Field(default="vision", description="vision, or local when the catalog confirmed an on-device parse")
+    catalog_flags: List[CatalogFlag] = Field(default_factory=list)
+    image_hash: Optional[str] = None
+    image_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    preview_url: Optional[str] = None
 
 class AllocationRequest(BaseModel):
     items: List[BillItem]
@@ -45,12 +62,40 @@ class AllocationRequest(BaseModel):
     tax_rate: float = Field(default=0.08, ge=0, le=1)
     tip_rate: float = Field(default=0.18, ge=0, le=1)
     grand_total: Decimal
+    currency: str = Field(default="USD", description="Currency of the grand total and of items without one")
+    settlement_currency: Optional[str] = Field(default=None, description="Currency results are reported in; defaults to currency")
 
 class AllocationResponse(BaseModel):
     allocations: List[PersonAllocation]
     total_calculated: Decimal
     total_expected: Decimal
     difference: Decimal
+    currency: Optional[str] = None
+
+class GroupBillRequest(BaseModel):
+    paid_by: str = Field(..., description="ID of the person who paid the bill")
+    allocation: AllocationRequest
+
+class GroupBillResponse(BaseModel):
+    bill_id: str
+    seq: int
+    allocation: AllocationResponse
+
+class Settlement(BaseModel):
+    from_person_id: str
+    to_person_id: str
+    amount: Decimal
+
+class GroupBalancesResponse(BaseModel):
+    group_id: str
+    currency: Optional[str] = Field(default=None, description="Currency of every balance in the group")
+    balances: Dict[str, Decimal]
+    settlements: List[Settlement]
+    entry_count: int
+
+class CatalogLearnResponse(BaseModel):
+    merchant: str
+    learned: int
 
 class HealthResponse(BaseModel):
     status: str
@@ -1,6 +1,8 @@
 import re
 from typing import Dict, List, Any
 from decimal import Decimal, ROUND_HALF_UP
+from app.models.internal import Item, Participant, Rule, Share, PersonResult, AllocationResult
+from app.services.currency_service import minor_units, quantize
 try:
     from app.services.llm_service import LLMService  # type: ignore
 except Exception:  # pragma: no cover
@@ -99,7 +101,35 @@ class AllocationService:
         grand_total: float
     ) -> Dict[str, Any]:
         """
-        Calculate bill splits based on items, people, and rules
+        Calculate bill splits based on items, people, and rules (dict interface)
+        """
+        result = self.allocate(
+            items=[Item.from_dict(item) for item in items],
+            people=[Participant(person['id'], person['name']) for person in people],
+            rules=[Rule.from_dict(rule) for rule in rules],
+            tax_rate=tax_rate,
+            tip_rate=tip_rate,
+            grand_total=grand_total
+        )
+        return {
+            'allocations': [allocation.to_dict() for allocation in result.allocations],
+            'total_calculated': result.total_calculated,
+            'difference': result.difference
+        }
+    
+    def allocate(
+        self,
+        items: List[Item],
+        people: List[Participant],
+        rules: List[Rule],
+        tax_rate: float,
+        tip_rate: float,
+        grand_total: float,
+        currency: str = 'USD'
+    ) -> AllocationResult:
+        """
+        Calculate bill splits based on items, people, and rules. Shares and
+        totals are rounded to the minor unit of `currency`.
         """
         # Debug: Log input data
         print(f"🔍 Allocation Service Input:")
@@ -117,110 +147,77 @@ class AllocationService:
             raise ValueError("At least one item is required for allocation")
         
         # Initialize allocations
-        allocations = []
+        allocations = [PersonResult.create(person) for person in people]
+        allocation_by_id = {}
+        for allocation in allocations:
+            allocation_by_id.setdefault(allocation.person_id, allocation)
+        person_by_name = {}
         for person in people:
-            allocations.append({
-                'person_id': person['id'],
-                'person_name': person['name'],
-                'items': [],
-                'subtotal': 0.0,
-                'tax_share': 0.0,
-                'tip_share': 0.0,
-                'total': 0.0
-            })
+            person_by_name.setdefault(person.name.lower(), person)
         
         # Create item map for easy lookup
-        item_map = {item['name'].lower(): item for item in items}
+        item_map = {item.name.lower(): item for item in items}
         
         # Track allocated quantities
-        allocated_quantities = {item['name'].lower(): 0 for item in items}
+        allocated_quantities = {item.name.lower(): 0 for item in items}
         
         # Apply rules
         for rule in rules:
             # Find person by person_id (from API) or person_name (from LLM parsing)
-            person = None
-            if 'person_id' in rule:
-                person = next((p for p in people if p['id'] == rule['person_id']), None)
-            elif 'person_name' in rule:
-                person = next((p for p in people if p['name'].lower() == rule['person_name'].lower()), None)
-            
-            if not person:
-                continue
+            if rule.person_id is not None:
+                allocation = allocation_by_id.get(rule.person_id)
+            elif rule.person_name is not None:
+                person = person_by_name.get(rule.person_name.lower())
+                allocation = allocation_by_id.get(person.id) if person else None
+            else:
+                allocation = None
             
-            allocation = next((a for a in allocations if a['person_id'] == person['id']), None)
             if not allocation:
                 continue
             
-            if rule['type'] == 'exclusive' and rule.get('item_name'):
-                item_name = rule['item_name'].lower()
+            if rule.type == 'exclusive' and rule.item_name:
+                item_name = rule.item_name.lower()
                 item = item_map.get(item_name)
                 if item:
-                    item_allocation = {
-                        'item_id': item['id'],
-                        'item_name': item['name'],
-                        'quantity': float(item['quantity']),
-                        'price': float(item['price']),
-                        'subtotal': float(item['quantity']) * float(item['price'])
-                    }
-                    allocation['items'].append(item_allocation)
-                    allocation['subtotal'] += item_allocation['subtotal']
-                    allocated_quantities[item_name] = item['quantity']
+                    share = Share(item, item.quantity, item.quantity * item.price)
+                    allocation.shares.append(share)
+                    allocation.subtotal += share.subtotal
+                    allocated_quantities[item_name] = item.quantity
             
-            elif rule['type'] == 'specific' and rule.get('item_name') and rule.get('quantity'):
-                item_name = rule['item_name'].lower()
+            elif rule.type == 'specific' and rule.item_name and rule.quantity:
+                item_name = rule.item_name.lower()
                 item = item_map.get(item_name)
                 if item:
                     current_allocated = allocated_quantities.get(item_name, 0)
-                    available_quantity = item['quantity'] - current_allocated
-                    quantity_to_allocate = min(rule['quantity'], available_quantity)
+                    available_quantity = item.quantity - current_allocated
+                    quantity_to_allocate = float(min(rule.quantity, available_quantity))
                     
                     if quantity_to_allocate > 0:
-                        item_allocation = {
-                            'item_id': item['id'],
-                            'item_name': item['name'],
-                            'quantity': float(quantity_to_allocate),
-                            'price': float(item['price']),
-                            'subtotal': float(quantity_to_allocate) * float(item['price'])
-                        }
-                        allocation['items'].append(item_allocation)
-                        allocation['subtotal'] += item_allocation['subtotal']
+                        share = Share(item, quantity_to_allocate, quantity_to_allocate * item.price)
+                        allocation.shares.append(share)
+                        allocation.subtotal += share.subtotal
                         allocated_quantities[item_name] = current_allocated + quantity_to_allocate
         
         # Distribute remaining items equally
-        remaining_items = [
-            item for item in items 
-            if allocated_quantities.get(item['name'].lower(), 0) < item['quantity']
-        ]
-        
-        if remaining_items and people:
-            for item in remaining_items:
-                allocated = allocated_quantities.get(item['name'].lower(), 0)
-                remaining_quantity = item['quantity'] - allocated
+        for item in items:
+            allocated = allocated_quantities.get(item.name.lower(), 0)
+            remaining_quantity = item.quantity - allocated
+            
+            if remaining_quantity > 0:
+                quantity_per_person = remaining_quantity // len(people)
+                remainder = remaining_quantity % len(people)
                 
-                if remaining_quantity > 0:
-                    quantity_per_person = remaining_quantity // len(people)
-                    remainder = remaining_quantity % len(people)
+                for i, person in enumerate(people):
+                    allocation = allocation_by_id.get(person.id)
+                    quantity_for_person = float(quantity_per_person + (1 if i < remainder else 0))
                     
-                    for i, person in enumerate(people):
-                        allocation = next((a for a in allocations if a['person_id'] == person['id']), None)
-                        if not allocation:
-                            continue
-                        
-                        quantity_for_person = quantity_per_person + (1 if i < remainder else 0)
-                        
-                        if quantity_for_person > 0:
-                            item_allocation = {
-                                'item_id': item['id'],
-                                'item_name': item['name'],
-                                'quantity': float(quantity_for_person),
-                                'price': float(item['price']),
-                                'subtotal': float(quantity_for_person) * float(item['price'])
-                            }
-                            allocation['items'].append(item_allocation)
-                            allocation['subtotal'] += item_allocation['subtotal']
+                    if quantity_for_person > 0:
+                        share = Share(item, quantity_for_person, quantity_for_person * item.price)
+                        allocation.shares.append(share)
+                        allocation.subtotal += share.subtotal
         
         # Calculate tax and tip distribution
-        total_subtotal = sum(a['subtotal'] for a in allocations)
+        total_subtotal = sum(a.subtotal for a in allocations)
         
         # Debug: Log subtotal calculation
         print(f"🔍 Total Subtotal: {total_subtotal}")
@@ -238,26 +235,29 @@ class AllocationService:
         total_tax = grand_total_float * tax_rate_float / (1 + tax_rate_float)
         total_tip = grand_total_float * tip_rate_float / (1 + tip_rate_float)
         
+        def to_minor_unit(amount: float) -> float:
+            return float(quantize(amount, currency))
+        
         # Distribute tax and tip proportionally
         for allocation in allocations:
             if total_subtotal > 0:
-                proportion = allocation['subtotal'] / total_subtotal
-                allocation['tax_share'] = round(total_tax * proportion, 2)
-                allocation['tip_share'] = round(total_tip * proportion, 2)
-            allocation['total'] = round(allocation['subtotal'] + allocation['tax_share'] + allocation['tip_share'], 2)
+                proportion = allocation.subtotal / total_subtotal
+                allocation.tax_share = to_minor_unit(total_tax * proportion)
+                allocation.tip_share = to_minor_unit(total_tip * proportion)
+            allocation.total = to_minor_unit(allocation.subtotal + allocation.tax_share + allocation.tip_share)
         
         # Rounding adjustment
-        total_calculated = sum(a['total'] for a in allocations)
+        total_calculated = sum(a.total for a in allocations)
         difference = grand_total - total_calculated
         
-        if abs(difference) > 0.01:
+        if abs(difference) > 10 ** -minor_units(currency):
             # Find allocation with largest total to absorb rounding difference
-            largest_allocation = max(allocations, key=lambda x: x['total'])
-            largest_allocation['total'] = round(largest_allocation['total'] + difference, 2)
-            total_calculated = sum(a['total'] for a in allocations)
+            largest_allocation = max(allocations, key=lambda x: x.total)
+            largest_allocation.total = to_minor_unit(largest_allocation.total + difference)
+            total_calculated = sum(a.total for a in allocations)
         
-        return {
-            'allocations': allocations,
-            'total_calculated': total_calculated,
-            'difference': difference
-        }
+        return AllocationResult(
+            allocations=allocations,
+            total_calculated=total_calculated,
+            difference=difference
+        )
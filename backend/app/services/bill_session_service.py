@@ -0,0 +1,159 @@
+import asyncio
+import json
+import math
+from typing import Dict, List, Any, Optional
+from fastapi.encoders import jsonable_encoder
+from app.models.internal import Item, Participant, Rule
+from app.models.schemas import BillItem, Person, AllocationRule
+from app.services.allocation_service import AllocationService
+from app.services.pubsub import InMemoryPubSubHub
+
+# Bill-level fields an edit operation may set directly, with the same bounds
+# as AllocationRequest (None means unbounded)
+SETTABLE_FIELDS = {'tax_rate': (0, 1), 'tip_rate': (0, 1), 'grand_total': (0, None)}
+
+
+class BillSession:
+    """
+    Shared state of one bill being edited by several clients
+    """
+
+    def __init__(self, bill_id: str):
+        self.bill_id = bill_id
+        self.version = 0
+        # Edits are validated once against the API models, then kept as compact
+        # records; rules stay models since the record drops their id and text
+        self.items: Dict[str, Item] = {}
+        self.people: Dict[str, Participant] = {}
+        self.rules: Dict[str, AllocationRule] = {}
+        self.fields: Dict[str, Any] = {'tax_rate': 0.08, 'tip_rate': 0.18, 'grand_total': 0.0}
+        # Last broadcast allocation per person, used to compute deltas
+        self.allocations: Dict[str, Dict[str, Any]] = {}
+        self.totals: Dict[str, Any] = {}
+        self.lock = asyncio.Lock()
+
+    def apply_op(self, op: Dict[str, Any]) -> None:
+        """
+        Apply one edit operation, validating payloads against the API models
+        """
+        op_type = op.get('op')
+        if op_type == 'set_item':
+            item = Item.from_model(BillItem(**op['item']))
+            # Sessions are not converted between currencies; every item is in the bill currency
+            if item.currency:
+                raise ValueError("Per-item currencies are not supported in bill sessions")
+            self.items[item.id] = item
+        elif op_type == 'remove_item':
+            self.items.pop(op['id'], None)
+        elif op_type == 'set_person':
+            person = Person(**op['person'])
+            self.people[person.id] = Participant(person.id, person.name)
+        elif op_type == 'remove_person':
+            self.people.pop(op['id'], None)
+        elif op_type == 'set_rule':
+            rule = AllocationRule(**op['rule'])
+            self.rules[rule.id] = rule
+        elif op_type == 'remove_rule':
+            self.rules.pop(op['id'], None)
+        elif op_type == 'set_field' and op.get('field') in SETTABLE_FIELDS:
+            field = op['field']
+            value = float(op['value'])
+            low, high = SETTABLE_FIELDS[field]
+            if not math.isfinite(value) or value < low or (high is not None and value > high):
+                raise ValueError(f"Invalid value for {field}: {op['value']}")
+            self.fields[field] = value
+        else:
+            raise ValueError(f"Unsupported operation: {op}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return jsonable_encoder({
+            'type': 'snapshot',
+            'bill_id': self.bill_id,
+            'version': self.version,
+            'items': [item.to_dict() for item in self.items.values()],
+            'people': [person.to_dict() for person in self.people.values()],
+            'rules': list(self.rules.values()),
+            **self.fields,
+            'allocations': list(self.allocations.values()),
+            **self.totals
+        })
+
+
+class BillSessionService:
+    def __init__(self, hub: Optional[InMemoryPubSubHub] = None):
+        self.hub = hub or InMemoryPubSubHub()
+        self.allocation_service = AllocationService()
+        self.sessions: Dict[str, BillSession] = {}
+
+    def get_session(self, bill_id: str) -> BillSession:
+        session = self.sessions.get(bill_id)
+        if session is None:
+            session = self.sessions[bill_id] = BillSession(bill_id)
+        return session
+
+    def release_session(self, bill_id: str) -> bool:
+        """
+        Drop a session once its last subscriber has left; returns whether it was dropped
+        """
+        if self.hub.subscriber_count(bill_id) == 0:
+            return self.sessions.pop(bill_id, None) is not None
+        return False
+
+    def _recalculate(self, session: BillSession) -> Dict[str, Any]:
+        """
+        Recompute allocations and return only the entries that changed
+        """
+        allocations: Dict[str, Dict[str, Any]] = {}
+        totals: Dict[str, Any] = {}
+        if session.items and session.people and session.fields['grand_total'] > 0:
+            result = self.allocation_service.allocate(
+                items=list(session.items.values()),
+                people=list(session.people.values()),
+                rules=[Rule.from_model(rule) for rule in session.rules.values()],
+                tax_rate=session.fields['tax_rate'],
+                tip_rate=session.fields['tip_rate'],
+                grand_total=session.fields['grand_total']
+            )
+            for allocation in result.allocations:
+                allocations[allocation.person_id] = {
+                    **allocation.to_dict(), 'currency': allocation.currency, 'original_totals': {}
+                }
+            totals = {
+                'total_calculated': result.total_calculated,
+                'difference': result.difference
+            }
+
+        changed = [a for pid, a in allocations.items() if session.allocations.get(pid) != a]
+        removed = [pid for pid in session.allocations if pid not in allocations]
+        session.allocations = allocations
+        session.totals = totals
+        return {'changed': changed, 'removed': removed, **totals}
+
+    async def apply_ops(self, bill_id: str, ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Apply a batch of edits, recompute and broadcast the delta to subscribers
+        """
+        session = self.get_session(bill_id)
+        async with session.lock:
+            # Apply the batch atomically: restore the previous state if any op is
+            # invalid or the result cannot be allocated
+            previous = (dict(session.items), dict(session.people), dict(session.rules), dict(session.fields),
+                        session.allocations, session.totals)
+            try:
+                for op in ops:
+                    session.apply_op(op)
+                changes = self._recalculate(session)
+            except Exception:
+                (session.items, session.people, session.rules, session.fields,
+                 session.allocations, session.totals) = previous
+                raise
+            session.version += 1
+            delta = {
+                'type': 'delta',
+                'bill_id': bill_id,
+                'version': session.version,
+                'ops': ops,
+                **changes
+            }
+            await self.hub.publish(bill_id, json.dumps(jsonable_encoder(delta)))
+        return delta
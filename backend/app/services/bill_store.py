@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.models.schemas import AllocationRequest
+
+
+@dataclass
+class StoredBill:
+    __slots__ = ('seq', 'group_id', 'bill_id', 'paid_by', 'created_at', 'request')
+    seq: int
+    group_id: str
+    bill_id: str
+    paid_by: str
+    created_at: datetime
+    request: AllocationRequest
+
+
+class BillStore:
+    """
+    In-memory store of group bills, in insertion order.
+
+    Every bill gets a sequence number that never changes (edits replace the
+    bill in place), so readers can page through the store in chunks and
+    resume after the last sequence number they saw.
+    """
+
+    def __init__(self):
+        self.bills: List[Optional[StoredBill]] = []
+        self.index: Dict[Tuple[str, str], int] = {}
+
+    def put(self, group_id: str, bill_id: str, paid_by: str, request: AllocationRequest) -> StoredBill:
+        position = self.index.get((group_id, bill_id))
+        if position is not None:
+            bill = self.bills[position]
+            bill.paid_by = paid_by
+            bill.request = request
+            return bill
+
+        bill = StoredBill(len(self.bills) + 1, group_id, bill_id, paid_by, datetime.utcnow(), request)
+        self.index[(group_id, bill_id)] = len(self.bills)
+        self.bills.append(bill)
+        return bill
+
+    def delete(self, group_id: str, bill_id: str) -> None:
+        position = self.index.pop((group_id, bill_id), None)
+        if position is not None:
+            self.bills[position] = None
+
+    def iter_chunks(
+        self,
+        after: int = 0,
+        limit: Optional[int] = None,
+        group_id: Optional[str] = None,
+        month: Optional[str] = None,
+        chunk_size: int = 500
+    ) -> Iterator[List[StoredBill]]:
+        """
+        Yield bills with seq > after in chunks, optionally filtered by group
+        and by creation month (YYYY-MM)
+        """
+        position = max(after, 0)
+        remaining = limit
+        while position < len(self.bills) and (remaining is None or remaining > 0):
+            chunk = []
+            window = self.bills[position:position + chunk_size]
+            position += len(window)
+            for bill in window:
+                if bill is None:
+                    continue
+                if group_id is not None and bill.group_id != group_id:
+                    continue
+                if month is not None and bill.created_at.strftime('%Y-%m') != month:
+                    continue
+                chunk.append(bill)
+                if remaining is not None:
+                    remaining -= 1
+                    if remaining == 0:
+                        break
+            if chunk:
+                yield chunk
@@ -0,0 +1,392 @@
+import os
+import re
+import shutil
+import hashlib
+import difflib
+import threading
+from typing import Dict, Iterable, List, Any, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+
+# Column files of the index; each is a flat .npy array so np.load can memory-map it
+COLUMNS = {
+    'merchant': np.uint64,  # hash of the normalized merchant name
+    'name': np.uint64,      # hash of the normalized item name
+    'price': np.int64,      # price in cents
+    'count': np.uint32,     # times this name/price pair was confirmed
+    'offset': np.uint64,    # start of the display name in names.bin
+    'length': np.uint32,
+}
+
+# Minimum similarity for snapping a misread name to a known one
+NAME_MATCH_THRESHOLD = 0.85
+
+_NORMALIZE_RE = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(text: str) -> str:
+    return _NORMALIZE_RE.sub(' ', text.lower()).strip()
+
+
+def hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def to_cents(price: Any) -> int:
+    return int(round(float(price) * 100))
+
+
+def is_likely_misread(ocr_price: int, known_price: int) -> bool:
+    """
+    A price that differs from the known one in a single digit, or only by a
+    misplaced decimal point, is more likely an OCR error than a price change
+    """
+    a, b = str(ocr_price), str(known_price)
+    if ocr_price * 10 == known_price or ocr_price == known_price * 10:
+        return True
+    return len(a) == len(b) and sum(x != y for x, y in zip(a, b)) == 1
+
+
+class CatalogIndex:
+    """
+    Read-only, sorted columnar index of (merchant, item name, price) entries.
+
+    Rows are sorted by merchant hash, name hash and price, so a merchant's
+    items form one contiguous range and an exact lookup is two binary
+    searches. Display names live in one UTF-8 blob addressed by offset.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], names: np.ndarray):
+        self.columns = columns
+        self.names = names
+        self._merchant_names: Dict[int, List[Tuple[str, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns['merchant'])
+
+    @classmethod
+    def empty(cls) -> 'CatalogIndex':
+        return cls({c: np.zeros(0, dtype=t) for c, t in COLUMNS.items()}, np.zeros(0, dtype=np.uint8))
+
+    @classmethod
+    def load(cls, path: str) -> 'CatalogIndex':
+        if not os.path.exists(os.path.join(path, 'names.bin')):
+            return cls.empty()
+        columns = {c: np.load(os.path.join(path, f"{c}.npy"), mmap_mode='r') for c in COLUMNS}
+        size = os.path.getsize(os.path.join(path, 'names.bin'))
+        names = np.memmap(os.path.join(path, 'names.bin'), dtype=np.uint8, mode='r') if size else np.zeros(0, np.uint8)
+        return cls(columns, names)
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[str, str, int, int]]) -> 'CatalogIndex':
+        """
+        Build an index from (merchant, display name, price cents, count) entries,
+        summing counts of duplicates
+        """
+        totals: Dict[Tuple[str, str, int], List[Any]] = {}
+        for merchant, name, price, count in entries:
+            key = (normalize(merchant), normalize(name), price)
+            if key in totals:
+                totals[key][1] += count
+            else:
+                totals[key] = [name, count]
+
+        n = len(totals)
+        merchant_col = np.empty(n, dtype=np.uint64)
+        name_col = np.empty(n, dtype=np.uint64)
+        price_col = np.empty(n, dtype=np.int64)
+        count_col = np.empty(n, dtype=np.uint32)
+        offset_col = np.empty(n, dtype=np.uint64)
+        length_col = np.empty(n, dtype=np.uint32)
+        blob = bytearray()
+        for i, ((merchant, name_key, price), (display, count)) in enumerate(totals.items()):
+            encoded = display.encode('utf-8')
+            merchant_col[i] = hash64(merchant)
+            name_col[i] = hash64(name_key)
+            price_col[i] = price
+            count_col[i] = min(count, np.iinfo(np.uint32).max)
+            offset_col[i] = len(blob)
+            length_col[i] = len(encoded)
+            blob += encoded
+
+        columns = {
+            'merchant': merchant_col, 'name': name_col, 'price': price_col,
+            'count': count_col, 'offset': offset_col, 'length': length_col,
+        }
+        return cls._sorted(columns, np.frombuffer(bytes(blob), dtype=np.uint8))
+
+    @classmethod
+    def _sorted(cls, columns: Dict[str, np.ndarray], names: np.ndarray) -> 'CatalogIndex':
+        """
+        Sort rows by merchant, name and price, folding duplicate rows into one
+        """
+        order = np.lexsort((columns['price'], columns['name'], columns['merchant']))
+        columns = {c: np.asarray(columns[c])[order] for c in COLUMNS}
+        if len(order) > 1:
+            starts = np.ones(len(order), dtype=bool)
+            starts[1:] = ((columns['merchant'][1:] != columns['merchant'][:-1])
+                          | (columns['name'][1:] != columns['name'][:-1])
+                          | (columns['price'][1:] != columns['price'][:-1]))
+            if not starts.all():
+                first = np.flatnonzero(starts)
+                counts = np.add.reduceat(columns['count'].astype(np.uint64), first)
+                columns = {c: columns[c][first] for c in COLUMNS}
+                columns['count'] = np.minimum(counts, np.iinfo(np.uint32).max).astype(np.uint32)
+
+        # Drop names no longer referenced once they take up half of the blob
+        used = int(columns['length'].sum())
+        if len(names) > 2 * used:
+            lengths = columns['length'].astype(np.int64)
+            offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+            gather = np.repeat(columns['offset'].astype(np.int64) - offsets, lengths) + np.arange(used)
+            names = np.asarray(names)[gather]
+            columns['offset'] = offsets.astype(np.uint64)
+        return cls(columns, names)
+
+    def merge(self, other: 'CatalogIndex') -> 'CatalogIndex':
+        """
+        Combine two indexes in one vectorized pass, summing counts of shared entries
+        """
+        names = np.concatenate([np.asarray(self.names), np.asarray(other.names)])
+        columns = {c: np.concatenate([np.asarray(self.columns[c]), np.asarray(other.columns[c])]) for c in COLUMNS}
+        columns['offset'][len(self):] += np.uint64(len(self.names))
+        return self._sorted(columns, names)
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to a directory, replacing any previous one atomically
+        """
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for column in COLUMNS:
+            np.save(os.path.join(tmp_path, f"{column}.npy"), np.ascontiguousarray(self.columns[column]))
+        with open(os.path.join(tmp_path, 'names.bin'), 'wb') as f:
+            f.write(np.asarray(self.names).tobytes())
+        old_path = f"{path}.old"
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.exists(path):
+            os.rename(path, old_path)
+        os.rename(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    def display_name(self, row: int) -> str:
+        start = int(self.columns['offset'][row])
+        return bytes(self.names[start:start + int(self.columns['length'][row])]).decode('utf-8')
+
+    def merchant_range(self, merchant_hash: int) -> Tuple[int, int]:
+        merchants = self.columns['merchant']
+        key = np.uint64(merchant_hash)
+        return (int(np.searchsorted(merchants, key, 'left')), int(np.searchsorted(merchants, key, 'right')))
+
+    def lookup(self, merchant_hash: int, name_hash: int) -> Optional[int]:
+        """
+        Row of the most confirmed price for an exact item name, or None
+        """
+        start, end = self.merchant_range(merchant_hash)
+        if start == end:
+            return None
+        names = self.columns['name'][start:end]
+        key = np.uint64(name_hash)
+        lo = int(np.searchsorted(names, key, 'left'))
+        hi = int(np.searchsorted(names, key, 'right'))
+        if lo == hi:
+            return None
+        if hi - lo == 1:
+            return start + lo
+        return start + lo + int(np.argmax(self.columns['count'][start + lo:start + hi]))
+
+    def merchant_names(self, merchant_hash: int) -> List[Tuple[str, str]]:
+        """
+        (normalized, display) names of one merchant's items, decoded once
+        """
+        cached = self._merchant_names.get(merchant_hash)
+        if cached is None:
+            start, end = self.merchant_range(merchant_hash)
+            seen = {}
+            for row in range(start, end):
+                display = self.display_name(row)
+                seen.setdefault(normalize(display), display)
+            cached = self._merchant_names[merchant_hash] = list(seen.items())
+        return cached
+
+
+class CatalogService:
+    """
+    Per-merchant item catalog learned from confirmed bill items.
+
+    Confirmations are buffered in memory and merged into the on-disk index
+    once `flush_size` of them have accumulated; lookups see both. Flushes run
+    on a worker thread: the pending batch is swapped out under a lock, stays
+    visible to lookups until the new index is loaded, and flushes never overlap.
+    """
+
+    def __init__(self, path: Optional[str] = None, flush_size: Optional[int] = None):
+        self.path = path or settings.CATALOG_DIR
+        self.flush_size = flush_size if flush_size is not None else settings.CATALOG_FLUSH_SIZE
+        self.index = CatalogIndex.load(self.path)
+        # (merchant, name) -> price cents -> [display name, count]
+        self.pending: Dict[Tuple[str, str], Dict[int, List[Any]]] = {}
+        # merchant -> normalized name -> display name, for fuzzy matching
+        self.pending_names: Dict[str, Dict[str, str]] = {}
+        self.pending_count = 0
+        # Batch being merged by a flush, in the same shape as pending
+        self.flushing: Dict[Tuple[str, str], Dict[int, List[Any]]] = {}
+        self.flushing_names: Dict[str, Dict[str, str]] = {}
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+
+    def learn(self, merchant: str, items: List[Dict[str, Any]]) -> int:
+        """
+        Record confirmed items for a merchant; returns the number learned
+        """
+        merchant_key = normalize(merchant)
+        if not merchant_key:
+            raise ValueError("Merchant name is required")
+        learned = 0
+        with self.lock:
+            for item in items:
+                name_key = normalize(str(item['name']))
+                if not name_key or float(item['price']) <= 0:
+                    continue
+                display = ' '.join(str(item['name']).split())
+                self._add_pending(merchant_key, name_key, to_cents(item['price']), display, 1)
+                learned += 1
+        return learned
+
+    def _add_pending(self, merchant_key: str, name_key: str, price: int, display: str, count: int) -> None:
+        prices = self.pending.setdefault((merchant_key, name_key), {})
+        if price in prices:
+            prices[price][1] += count
+        else:
+            prices[price] = [display, count]
+            self.pending_count += 1
+        self.pending_names.setdefault(merchant_key, {}).setdefault(name_key, display)
+
+    def flush_if_needed(self) -> bool:
+        if self.pending_count >= self.flush_size:
+            self.flush()
+            return True
+        return False
+
+    def flush(self) -> None:
+        """
+        Merge pending confirmations into the index and persist it
+        """
+        with self.flush_lock:
+            with self.lock:
+                if not self.pending:
+                    return
+                batch = self.flushing = self.pending
+                self.flushing_names = self.pending_names
+                self.pending = {}
+                self.pending_names = {}
+                self.pending_count = 0
+            try:
+                learned = CatalogIndex.build(
+                    (merchant_key, display, price, count)
+                    for (merchant_key, _), prices in batch.items()
+                    for price, (display, count) in prices.items()
+                )
+                self.index.merge(learned).save(self.path)
+                index = CatalogIndex.load(self.path)
+            except Exception:
+                # Keep the batch for the next flush
+                with self.lock:
+                    for (merchant_key, name_key), prices in batch.items():
+                        for price, (display, count) in prices.items():
+                            self._add_pending(merchant_key, name_key, price, display, count)
+                    self.flushing = {}
+                    self.flushing_names = {}
+                raise
+            with self.lock:
+                self.index = index
+                self.flushing = {}
+                self.flushing_names = {}
+
+    def _known(self, merchant_key: str, name_key: str) -> Optional[Tuple[str, int, int]]:
+        """
+        Best (display name, price cents, count) for an exact name, across index and pending
+        """
+        best = None
+        row = self.index.lookup(hash64(merchant_key), hash64(name_key))
+        if row is not None:
+            best = (self.index.display_name(row), int(self.index.columns['price'][row]),
+                    int(self.index.columns['count'][row]))
+        for pending in (self.flushing, self.pending):
+            for price, (display, count) in pending.get((merchant_key, name_key), {}).items():
+                if best is None or count > best[2]:
+                    best = (display, price, count)
+        return best
+
+    def _closest_name(self, merchant_key: str, name_key: str) -> Optional[str]:
+        candidates = dict(self.index.merchant_names(hash64(merchant_key)))
+        for pending_names in (self.flushing_names, self.pending_names):
+            for name, display in pending_names.get(merchant_key, {}).items():
+                candidates.setdefault(name, display)
+        matches = difflib.get_close_matches(name_key, list(candidates), n=1, cutoff=NAME_MATCH_THRESHOLD)
+        return matches[0] if matches else None
+
+    def match_item(self, merchant: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compare one OCR'd item with the catalog.
+
+        Returns the status (exact, name_corrected, price_misread,
+        price_changed or unknown), the name and price to use, and the known
+        price. Likely misreads are snapped to the known price; other price
+        differences keep the OCR'd price.
+        """
+        merchant_key = normalize(merchant)
+        name_key = normalize(str(item.get('name', '')))
+        price = to_cents(item.get('price') or 0)
+        status = 'exact'
+
+        known = self._known(merchant_key, name_key)
+        if known is None:
+            closest = self._closest_name(merchant_key, name_key)
+            known = self._known(merchant_key, closest) if closest else None
+            status = 'name_corrected'
+        if known is None:
+            return {'status': 'unknown', 'name': item.get('name'), 'price': item.get('price'), 'known_price': None}
+
+        display, known_price, _ = known
+        result_price = known_price / 100
+        if known_price != price:
+            if is_likely_misread(price, known_price):
+                status = 'price_misread' if status == 'exact' else status
+            else:
+                result_price = item.get('price')
+                status = 'price_changed' if status == 'exact' else status
+        return {'status': status, 'name': display, 'price': result_price, 'known_price': known_price / 100}
+
+    def apply(self, merchant: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Snap items to the catalog in place; returns one flag per changed or suspicious item
+        """
+        flags = []
+        for item in items:
+            match = self.match_item(merchant, item)
+            if match['status'] in ('exact', 'unknown'):
+                continue
+            flags.append({
+                'item_id': item.get('id'),
+                'status': match['status'],
+                'ocr_name': item.get('name'),
+                'ocr_price': item.get('price'),
+                'suggested_name': match['name'],
+                'suggested_price': match['known_price']
+            })
+            item['name'] = match['name']
+            item['price'] = match['price']
+        return flags
+
+    def is_confident(self, merchant: str, parsed: Dict[str, Any]) -> bool:
+        """
+        Whether a local parse can be trusted without the vision model: every
+        item is a known catalog entry and the items add up to the printed subtotal
+        """
+        items = parsed['items']
+        # Without a printed subtotal there is no way to tell whether lines were missed
+        if not items or parsed.get('subtotal_matches') is not True:
+            return False
+        return all(self.match_item(merchant, item)['status'] == 'exact' for item in items)
@@ -0,0 +1,147 @@
+import json
+import time
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Any, Optional, Sequence, Union
+import numpy as np
+from app.core.config import settings
+from app.models.internal import Item, PersonResult
+
+# Digits after the decimal point for currencies that do not use cents
+MINOR_UNITS = {
+    'BIF': 0, 'CLP': 0, 'DJF': 0, 'GNF': 0, 'ISK': 0, 'JPY': 0, 'KMF': 0, 'KRW': 0,
+    'PYG': 0, 'RWF': 0, 'UGX': 0, 'VND': 0, 'VUV': 0, 'XAF': 0, 'XOF': 0, 'XPF': 0,
+    'BHD': 3, 'IQD': 3, 'JOD': 3, 'KWD': 3, 'LYD': 3, 'OMR': 3, 'TND': 3,
+}
+
+
+def minor_units(currency: str) -> int:
+    return MINOR_UNITS.get(currency, 2)
+
+
+def quantize(amount: float, currency: str) -> Decimal:
+    """
+    Round an amount half up to the currency's minor unit
+    """
+    return Decimal(str(amount)).quantize(Decimal(1).scaleb(-minor_units(currency)), rounding=ROUND_HALF_UP)
+
+
+class RateProvider:
+    """
+    Exchange rates from a local JSON table, cached in memory with expiry.
+
+    The table has the form {"base": "USD", "rates": {"EUR": 0.92, ...}},
+    where each rate is the amount of that currency per unit of base.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: Optional[float] = None):
+        self.path = path if path is not None else settings.EXCHANGE_RATES_FILE
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.EXCHANGE_RATES_TTL
+        self._rates: Optional[Dict[str, float]] = None
+        self._loaded_at = 0.0
+
+    def load_table(self, table: Dict[str, Any]) -> None:
+        """
+        Replace the cached rates with a table already in memory
+        """
+        rates = {code.upper(): float(rate) for code, rate in table.get('rates', {}).items()}
+        rates[table.get('base', 'USD').upper()] = 1.0
+        if any(rate <= 0 for rate in rates.values()):
+            raise ValueError("Exchange rates must be positive")
+        self._rates = rates
+        self._loaded_at = time.monotonic()
+
+    def get_rates(self) -> Dict[str, float]:
+        expired = time.monotonic() - self._loaded_at > self.ttl_seconds
+        if self.path and (self._rates is None or expired):
+            with open(self.path) as f:
+                self.load_table(json.load(f))
+        return self._rates or {}
+
+    def convert(
+        self,
+        amounts: Sequence[float],
+        from_currencies: Sequence[str],
+        to_currencies: Union[str, Sequence[str]]
+    ) -> np.ndarray:
+        """
+        Convert many amounts in a single vectorized pass. Each result is rounded
+        to the minor unit of its own target currency.
+        """
+        values = np.asarray(amounts, dtype=np.float64)
+        if isinstance(to_currencies, str):
+            to_currencies = [to_currencies] * len(values)
+        codes, inverse = np.unique(np.asarray(list(from_currencies) + list(to_currencies), dtype=str),
+                                   return_inverse=True)
+        inverse = inverse.reshape(-1)
+        from_index, to_index = inverse[:len(values)], inverse[len(values):]
+        if len(codes) == 1:
+            return values
+
+        rates = self.get_rates()
+        missing = [c for c in codes if c not in rates]
+        if missing:
+            raise ValueError(f"No exchange rate for: {', '.join(missing)}")
+
+        per_base = np.array([rates[c] for c in codes])
+        converted = values * per_base[to_index] / per_base[from_index]
+        # np.round would round binary floats half to even; money rounds half up
+        return np.array([float(quantize(amount, code))
+                         for amount, code in zip(converted.tolist(), codes[to_index].tolist())])
+
+
+class CurrencyService:
+    def __init__(self, rate_provider: Optional[RateProvider] = None):
+        self.rate_provider = rate_provider or RateProvider()
+
+    def convert_items(
+        self,
+        items: List[Item],
+        grand_total: float,
+        currency: str,
+        settlement_currency: str
+    ) -> float:
+        """
+        Convert item prices into the settlement currency in place and return the
+        converted grand total. Items without a currency are in the bill currency;
+        each keeps its original price and currency.
+        """
+        currencies = [(item.currency or currency).upper() for item in items]
+        amounts = [item.price for item in items] + [float(grand_total)]
+        converted = self.rate_provider.convert(amounts, currencies + [currency], settlement_currency)
+
+        for item, item_currency, price in zip(items, currencies, converted.tolist()):
+            item.original_currency = item_currency
+            item.original_price = item.price
+            item.price = price
+            item.currency = settlement_currency
+        return float(converted[-1])
+
+    def add_original_totals(self, allocations: List[PersonResult], settlement_currency: str) -> None:
+        """
+        Report each person's total in the currencies their items were charged in.
+
+        The total (including tax and tip) is split by the share of the person's
+        subtotal coming from each original currency, then converted back.
+        """
+        pending = []
+        for allocation in allocations:
+            by_currency: Dict[str, float] = {}
+            for share in allocation.shares:
+                original_currency = share.item.original_currency or settlement_currency
+                by_currency[original_currency] = by_currency.get(original_currency, 0.0) + share.subtotal
+
+            allocation.currency = settlement_currency
+            allocation.original_totals = {}
+            if allocation.subtotal > 0:
+                for code, amount in by_currency.items():
+                    pending.append((allocation, code, allocation.total * amount / allocation.subtotal))
+
+        # Convert every portion back into its original currency at once
+        if pending:
+            converted = self.rate_provider.convert(
+                [portion for _, _, portion in pending],
+                [settlement_currency] * len(pending),
+                [code for _, code, _ in pending]
+            )
+            for (allocation, code, _), amount in zip(pending, converted.tolist()):
+                allocation.original_totals[code] = quantize(amount, code)
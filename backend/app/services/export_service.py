@@ -0,0 +1,180 @@
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List, Any, Optional
+from app.models.internal import Item, Participant, Rule
+from app.services.allocation_service import AllocationService
+from app.services.bill_store import BillStore, StoredBill
+from app.services.currency_service import CurrencyService
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except Exception:  # pragma: no cover
+    pa = None  # type: ignore
+    pq = None  # type: ignore
+
+EXPORT_COLUMNS = [
+    'bill_seq', 'group_id', 'bill_id', 'created_at', 'paid_by', 'person_id', 'person_name',
+    'subtotal', 'tax_share', 'tip_share', 'total', 'currency', 'error'
+]
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class _ChunkSink:
+    """
+    Write-only file object that hands written bytes back to a generator
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class ExportService:
+    def __init__(self, bill_store: BillStore, allocation_service: Optional[AllocationService] = None,
+                 currency_service: Optional[CurrencyService] = None):
+        self.bill_store = bill_store
+        self.allocation_service = allocation_service or AllocationService()
+        self.currency_service = currency_service or CurrencyService()
+
+    def _allocate(self, bill: StoredBill) -> List[Dict[str, Any]]:
+        """
+        Allocate one stored bill and return one row per person
+        """
+        request = bill.request
+        items = [Item.from_model(item) for item in request.items]
+        currency = request.currency.upper()
+        settlement_currency = (request.settlement_currency or currency).upper()
+        grand_total = self.currency_service.convert_items(items, float(request.grand_total), currency, settlement_currency)
+        result = self.allocation_service.allocate(
+            items=items,
+            people=[Participant(person.id, person.name) for person in request.people],
+            rules=[Rule.from_model(rule) for rule in request.rules],
+            tax_rate=request.tax_rate,
+            tip_rate=request.tip_rate,
+            grand_total=grand_total,
+            currency=settlement_currency
+        )
+        created_at = bill.created_at.isoformat()
+        return [
+            {
+                'bill_seq': bill.seq,
+                'group_id': bill.group_id,
+                'bill_id': bill.bill_id,
+                'created_at': created_at,
+                'paid_by': bill.paid_by,
+                'person_id': allocation.person_id,
+                'person_name': allocation.person_name,
+                'subtotal': round(allocation.subtotal, 2),
+                'tax_share': allocation.tax_share,
+                'tip_share': allocation.tip_share,
+                'total': allocation.total,
+                'currency': settlement_currency,
+                'error': None
+            }
+            for allocation in result.allocations
+        ]
+
+    @staticmethod
+    def _error_row(bill: StoredBill, error: Exception) -> Dict[str, Any]:
+        """
+        Row standing in for a bill that could not be allocated, so the export is visibly incomplete
+        """
+        row: Dict[str, Any] = dict.fromkeys(EXPORT_COLUMNS)
+        row.update({
+            'bill_seq': bill.seq,
+            'group_id': bill.group_id,
+            'bill_id': bill.bill_id,
+            'created_at': bill.created_at.isoformat(),
+            'paid_by': bill.paid_by,
+            'error': str(error) or type(error).__name__
+        })
+        return row
+
+    def iter_row_chunks(self, **filters) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Lazily allocate bills chunk by chunk. A bill that fails to allocate
+        becomes a single row with its bill_seq and the error.
+        """
+        for bills in self.bill_store.iter_chunks(**filters):
+            rows = []
+            for bill in bills:
+                try:
+                    rows.extend(self._allocate(bill))
+                except Exception as e:
+                    print(f"⚠️ Bill {bill.bill_id} failed in export: {str(e)}")
+                    rows.append(self._error_row(bill, e))
+            if rows:
+                yield rows
+
+    def stream(self, format: str, **filters) -> Iterator[bytes]:
+        """
+        Encode the export incrementally, one chunk of bills at a time
+        """
+        if format == 'csv':
+            return self._stream_csv(self.iter_row_chunks(**filters))
+        if format == 'ndjson':
+            return self._stream_ndjson(self.iter_row_chunks(**filters))
+        if format == 'parquet':
+            if pq is None:
+                raise ValueError("Parquet export requires pyarrow")
+            return self._stream_parquet(self.iter_row_chunks(**filters))
+        raise ValueError(f"Format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    def _stream_csv(self, chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        for rows in chunks:
+            writer.writerows(rows)
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+    def _stream_ndjson(self, chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+        for rows in chunks:
+            yield ''.join(json.dumps(row) + '\n' for row in rows).encode('utf-8')
+
+    def _stream_parquet(self, chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+        schema = pa.schema([
+            ('bill_seq', pa.int64()), ('group_id', pa.string()), ('bill_id', pa.string()),
+            ('created_at', pa.string()), ('paid_by', pa.string()), ('person_id', pa.string()),
+            ('person_name', pa.string()), ('subtotal', pa.float64()), ('tax_share', pa.float64()),
+            ('tip_share', pa.float64()), ('total', pa.float64()), ('currency', pa.string()),
+            ('error', pa.string())
+        ])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema)
+        try:
+            # Each chunk of bills becomes one row group
+            for rows in chunks:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                data = sink.drain()
+                if data:
+                    yield data
+        finally:
+            writer.close()
+        yield sink.drain()
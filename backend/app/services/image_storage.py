@@ -0,0 +1,166 @@
+import io
+import os
+import hashlib
+import tempfile
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+
+try:
+    from PIL import Image  # type: ignore
+except Exception:  # pragma: no cover
+    Image = None  # type: ignore
+
+# Derived sizes generated after upload: variant name -> max edge in pixels
+VARIANT_SIZES = {
+    'thumb': 256,
+    'preview': 1024,
+}
+
+
+def sniff_content_type(header: bytes) -> str:
+    """
+    Detect the image type from its first bytes
+    """
+    if header.startswith(b'\xff\xd8'):
+        return 'image/jpeg'
+    if header.startswith(b'\x89PNG'):
+        return 'image/png'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'image/webp'
+    return 'application/octet-stream'
+
+
+class ImageStorageService:
+    """
+    Content-addressed store for uploaded receipt images.
+
+    Each upload is written once under its SHA-256 hash, so re-uploading the
+    same receipt costs nothing and every stored file is immutable. Files live
+    at `<root>/<hash[:2]>/<hash>.<variant>`.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = root or settings.UPLOAD_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else settings.UPLOAD_MAX_BYTES
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, image_hash: str, variant: str = 'original') -> str:
+        return os.path.join(self.root, image_hash[:2], f"{image_hash}.{variant}")
+
+    def is_valid_hash(self, image_hash: str) -> bool:
+        return len(image_hash) == 64 and all(c in '0123456789abcdef' for c in image_hash)
+
+    def save(self, data: bytes) -> str:
+        """
+        Store an upload under its content hash and return the hash
+        """
+        image_hash = hashlib.sha256(data).hexdigest()
+        path = self.path_for(image_hash)
+        if os.path.exists(path):
+            os.utime(path)
+            return image_hash
+
+        self._write_atomic(path, data)
+        return image_hash
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def generate_variants(self, image_hash: str) -> List[str]:
+        """
+        Create the thumbnail and preview sizes; meant to run off the request path
+        """
+        if Image is None:
+            print("⚠️ Pillow not installed, skipping thumbnail generation")
+            return []
+
+        generated = []
+        try:
+            with Image.open(self.path_for(image_hash)) as original:
+                original = original.convert('RGB')
+                for variant, size in VARIANT_SIZES.items():
+                    path = self.path_for(image_hash, variant)
+                    if os.path.exists(path):
+                        continue
+                    resized = original.copy()
+                    resized.thumbnail((size, size))
+                    buffer = io.BytesIO()
+                    resized.save(buffer, format='JPEG', quality=85)
+                    self._write_atomic(path, buffer.getvalue())
+                    generated.append(variant)
+        except Exception as e:
+            print(f"⚠️ Thumbnail generation failed for {image_hash}: {str(e)}")
+        return generated
+
+    def process_upload(self, image_hash: str) -> None:
+        """
+        Background work after an upload: derived sizes, then eviction
+        """
+        self.generate_variants(image_hash)
+        self.enforce_limit(keep=image_hash)
+
+    def resolve(self, image_hash: str, variant: str = 'original') -> Optional[Tuple[str, str]]:
+        """
+        Find a stored file, falling back to the original if a variant is not ready yet.
+        Returns (path, content type) or None.
+        """
+        if not self.is_valid_hash(image_hash):
+            return None
+        path = self.path_for(image_hash, variant)
+        if variant != 'original' and os.path.exists(path):
+            return path, 'image/jpeg'
+        path = self.path_for(image_hash)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            content_type = sniff_content_type(f.read(12))
+        return path, content_type
+
+    def enforce_limit(self, keep: Optional[str] = None) -> int:
+        """
+        Evict least recently stored images until the directory fits in max_bytes.
+        All variants of an image are evicted together. Returns bytes freed.
+        """
+        images: Dict[str, List[Tuple[str, int, float]]] = {}
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                # In-flight writes from _write_atomic belong to another request
+                if filename.endswith('.tmp'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                images.setdefault(filename.split('.')[0], []).append((path, stat.st_size, stat.st_mtime))
+                total += stat.st_size
+
+        if total <= self.max_bytes:
+            return 0
+
+        freed = 0
+        by_age = sorted(images.items(), key=lambda kv: max(f[2] for f in kv[1]))
+        for image_hash, files in by_age:
+            if total - freed <= self.max_bytes:
+                break
+            if image_hash == keep:
+                continue
+            for path, size, _ in files:
+                try:
+                    os.remove(path)
+                    freed += size
+                except FileNotFoundError:
+                    pass
+        return freed
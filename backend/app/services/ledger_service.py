@@ -0,0 +1,189 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Any, Optional, Tuple
+from app.services.currency_service import quantize
+
+
+@dataclass
+class LedgerEntry:
+    seq: int
+    bill_id: str
+    action: str  # add, edit or delete
+    deltas: Dict[str, Decimal]
+    timestamp: str
+
+
+class GroupLedger:
+    """
+    Append-only log of allocation events for one group.
+
+    Each entry stores the net balance change it caused, so running balances
+    are updated incrementally and a balance query never touches the history.
+    Snapshots every `snapshot_interval` entries bound the replay needed to
+    rebuild balances at any point in time.
+    """
+
+    def __init__(self, snapshot_interval: int = 1000):
+        self.snapshot_interval = snapshot_interval
+        # Every amount in the ledger is in this currency, set by the first bill
+        self.currency: Optional[str] = None
+        self.entries: List[LedgerEntry] = []
+        self.balances: Dict[str, Decimal] = {}
+        # Current net effect of every live bill, needed to diff edits and deletes
+        self.bills: Dict[str, Dict[str, Decimal]] = {}
+        self.snapshot_seqs: List[int] = []
+        self.snapshots: List[Dict[str, Decimal]] = []
+
+    def apply(self, bill_id: str, effect: Optional[Dict[str, Decimal]]) -> LedgerEntry:
+        """
+        Record a bill's new net effect (None deletes it) and update balances
+        """
+        previous = self.bills.get(bill_id, {})
+        if effect is None:
+            action = 'delete'
+            self.bills.pop(bill_id, None)
+            effect = {}
+        else:
+            action = 'edit' if bill_id in self.bills else 'add'
+            self.bills[bill_id] = effect
+
+        deltas = {}
+        for person_id in set(previous) | set(effect):
+            delta = effect.get(person_id, Decimal('0')) - previous.get(person_id, Decimal('0'))
+            if delta:
+                deltas[person_id] = delta
+                self.balances[person_id] = self.balances.get(person_id, Decimal('0')) + delta
+
+        entry = LedgerEntry(
+            seq=len(self.entries) + 1,
+            bill_id=bill_id,
+            action=action,
+            deltas=deltas,
+            timestamp=datetime.utcnow().isoformat()
+        )
+        self.entries.append(entry)
+
+        if entry.seq % self.snapshot_interval == 0:
+            self.snapshot_seqs.append(entry.seq)
+            self.snapshots.append(dict(self.balances))
+
+        return entry
+
+    def balances_at(self, seq: Optional[int] = None) -> Dict[str, Decimal]:
+        """
+        Rebuild balances as of `seq` from the nearest snapshot
+        """
+        if seq is None or seq >= len(self.entries):
+            seq = len(self.entries)
+
+        index = bisect_right(self.snapshot_seqs, seq) - 1
+        if index >= 0:
+            start, balances = self.snapshot_seqs[index], dict(self.snapshots[index])
+        else:
+            start, balances = 0, {}
+
+        for entry in self.entries[start:seq]:
+            for person_id, delta in entry.deltas.items():
+                balances[person_id] = balances.get(person_id, Decimal('0')) + delta
+        return balances
+
+
+class LedgerService:
+    def __init__(self, snapshot_interval: int = 1000):
+        self.snapshot_interval = snapshot_interval
+        self.groups: Dict[str, GroupLedger] = {}
+
+    def _group(self, group_id: str) -> GroupLedger:
+        ledger = self.groups.get(group_id)
+        if ledger is None:
+            ledger = self.groups[group_id] = GroupLedger(self.snapshot_interval)
+        return ledger
+
+    def record_bill(
+        self,
+        group_id: str,
+        bill_id: str,
+        paid_by: str,
+        allocations: List[Dict[str, Any]],
+        currency: str = 'USD'
+    ) -> LedgerEntry:
+        """
+        Add or replace a bill from its `calculate_allocations` output.
+
+        The payer is credited with the bill total and every person is debited
+        their allocated total, so a positive balance means the person is owed.
+        Totals must be in the group's settlement currency.
+        """
+        ledger = self._group(group_id)
+        currency = currency.upper()
+        if ledger.currency is None:
+            ledger.currency = currency
+        elif ledger.currency != currency:
+            raise ValueError(f"Group {group_id} settles in {ledger.currency}, not {currency}")
+
+        effect: Dict[str, Decimal] = {}
+        for allocation in allocations:
+            amount = quantize(allocation['total'], currency)
+            person_id = allocation['person_id']
+            effect[person_id] = effect.get(person_id, Decimal('0')) - amount
+            effect[paid_by] = effect.get(paid_by, Decimal('0')) + amount
+
+        return ledger.apply(bill_id, {p: a for p, a in effect.items() if a})
+
+    def delete_bill(self, group_id: str, bill_id: str) -> LedgerEntry:
+        """
+        Remove a bill's effect from the group balances
+        """
+        ledger = self.groups.get(group_id)
+        if ledger is None or bill_id not in ledger.bills:
+            raise ValueError(f"Bill {bill_id} not found in group {group_id}")
+        return ledger.apply(bill_id, None)
+
+    def group_currency(self, group_id: str) -> Optional[str]:
+        ledger = self.groups.get(group_id)
+        return ledger.currency if ledger else None
+
+    def get_balance(self, group_id: str, person_id: str) -> Decimal:
+        """
+        Current balance of one person, constant time
+        """
+        ledger = self.groups.get(group_id)
+        if ledger is None:
+            return Decimal('0')
+        return ledger.balances.get(person_id, Decimal('0'))
+
+    def get_balances(self, group_id: str) -> Dict[str, Decimal]:
+        """
+        Current balances of everyone in the group
+        """
+        ledger = self.groups.get(group_id)
+        return dict(ledger.balances) if ledger else {}
+
+    def get_settlements(self, group_id: str) -> List[Tuple[str, str, Decimal]]:
+        """
+        Suggest (from, to, amount) payments that settle the group
+        """
+        balances = self.get_balances(group_id)
+        debtors = sorted(((-b, p) for p, b in balances.items() if b < 0), reverse=True)
+        creditors = sorted(((b, p) for p, b in balances.items() if b > 0), reverse=True)
+
+        settlements = []
+        i = j = 0
+        while i < len(debtors) and j < len(creditors):
+            owed, debtor = debtors[i]
+            due, creditor = creditors[j]
+            amount = min(owed, due)
+            settlements.append((debtor, creditor, amount))
+            debtors[i] = (owed - amount, debtor)
+            creditors[j] = (due - amount, creditor)
+            if debtors[i][0] == 0:
+                i += 1
+            if creditors[j][0] == 0:
+                j += 1
+        return settlements
+
+    def entry_count(self, group_id: str) -> int:
+        ledger = self.groups.get(group_id)
+        return len(ledger.entries) if ledger else 0
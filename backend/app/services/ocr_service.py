@@ -1,13 +1,58 @@
 import io
-import re
 import json
+import math
 import base64
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from app.core.config import settings
+from app.services.receipt_parser import parse_receipt_items, parse_receipt_text
+
+try:
+    from PIL import Image  # type: ignore
+except Exception:  # pragma: no cover
+    Image = None  # type: ignore
+
+RECEIPT_PROMPT = """Extract all items from this receipt. For each item, provide: name, quantity, and price. 
+                                Return the result as a JSON array with this exact structure: 
+                                [{"name": "item name", "quantity": 1, "price": 10.99, "is_taxable": true}]
+                                
+                                Rules:
+                                - Only return the JSON array, no other text
+                                - Use exact item names from the receipt
+                                - Set quantity to 1 if not specified
+                                - Extract price as a number (no currency symbols)
+                                - Set is_taxable to true for all items
+                                - Skip non-item lines like totals, taxes, etc."""
+
+TILE_PROMPT = """This image is one horizontal slice of a long receipt. Extract the items visible in it.
+                                Return the result as a JSON object with this exact structure: 
+                                {"items": [{"name": "item name", "quantity": 1, "price": 10.99, "is_taxable": true}], "subtotal": null, "total": null}
+                                
+                                Rules:
+                                - Only return the JSON object, no other text
+                                - Include an item only if its name and price are both fully visible
+                                - Use exact item names from the receipt, in receipt order
+                                - Set quantity to 1 if not specified
+                                - Extract prices as numbers (no currency symbols)
+                                - Set is_taxable to true for all items
+                                - Set subtotal and total to the printed amounts if visible, otherwise null
+                                - Do not list subtotal, tax, tip or total lines as items"""
+
+# Receipts taller than this (height / width) are OCR'd in tiles
+TALL_ASPECT_RATIO = 2.5
+# Target tile shape (height / width) and the fraction shared by neighbouring tiles
+TILE_ASPECT_RATIO = 1.5
+TILE_OVERLAP = 0.15
+MAX_TILES = 8
 
 class OCRService:
     def __init__(self):
+        # Vision calls are blocking; run them (and tiles in parallel) on a dedicated pool
+        # shared by all requests, sized so concurrent tall receipts do not queue
+        self.executor = ThreadPoolExecutor(max_workers=max(settings.OCR_MAX_WORKERS, MAX_TILES))
+        
         # Initialize OpenAI client
         self.openai_client = None
         try:
@@ -45,6 +90,51 @@ class OCRService:
             print(f"❌ Vision model processing error: {str(e)}")
             raise Exception(f"Vision model processing failed: {str(e)}")
 
+    def _call_vision_model(self, image_data: bytes, prompt: str) -> str:
+        """
+        Send one image to GPT-4 Vision and return the raw response text (blocking)
+        """
+        # Encode image to base64
+        base64_image = base64.b64encode(image_data).decode("utf-8")
+        print(f"🔍 Image encoded to base64: {len(base64_image)} characters")
+        
+        response = self.openai_client.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": prompt
+                        },
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:image/jpeg;base64,{base64_image}"
+                            }
+                        }
+                    ]
+                }
+            ],
+            max_tokens=settings.OCR_MAX_TOKENS
+        )
+        return response.choices[0].message.content
+    
+    @staticmethod
+    def _strip_code_fences(text: str) -> str:
+        """
+        Clean the response text - remove markdown code blocks if present
+        """
+        cleaned_text = text.strip()
+        if cleaned_text.startswith('```json'):
+            cleaned_text = cleaned_text[7:]  # Remove ```json
+        if cleaned_text.startswith('```'):
+            cleaned_text = cleaned_text[3:]  # Remove ```
+        if cleaned_text.endswith('```'):
+            cleaned_text = cleaned_text[:-3]  # Remove ```
+        return cleaned_text.strip()
+
     async def _extract_with_vision_model(self, image_data: bytes) -> Dict[str, Any]:
         """
         Extract text and items using GPT-4 Vision
@@ -57,61 +147,21 @@ class OCRService:
                 'items': []
             }
         
+        # Long receipts are read in overlapping slices so the text stays legible.
+        # Decoding and re-encoding tiles is CPU work, so it also runs off the event loop.
+        loop = asyncio.get_running_loop()
+        tiles = await loop.run_in_executor(self.executor, self._split_into_tiles, image_data)
+        if len(tiles) > 1:
+            return await self._extract_tiled(tiles)
+        
         try:
-            # Encode image to base64
-            base64_image = base64.b64encode(image_data).decode("utf-8")
-            print(f"🔍 Image encoded to base64: {len(base64_image)} characters")
-            
-            # Call GPT-4 Vision
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": """Extract all items from this receipt. For each item, provide: name, quantity, and price. 
-                                Return the result as a JSON array with this exact structure: 
-                                [{"name": "item name", "quantity": 1, "price": 10.99, "is_taxable": true}]
-                                
-                                Rules:
-                                - Only return the JSON array, no other text
-                                - Use exact item names from the receipt
-                                - Set quantity to 1 if not specified
-                                - Extract price as a number (no currency symbols)
-                                - Set is_taxable to true for all items
-                                - Skip non-item lines like totals, taxes, etc."""
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=1000
-            )
-            
-            # Extract the response
-            response_text = response.choices[0].message.content
+            # Call GPT-4 Vision off the event loop
+            response_text = await loop.run_in_executor(self.executor, self._call_vision_model, image_data, RECEIPT_PROMPT)
             print(f"🔍 Vision model response: {len(response_text)} characters")
             
             # Parse JSON response
             try:
-                # Clean the response text - remove markdown code blocks if present
-                cleaned_text = response_text.strip()
-                if cleaned_text.startswith('```json'):
-                    cleaned_text = cleaned_text[7:]  # Remove ```json
-                if cleaned_text.startswith('```'):
-                    cleaned_text = cleaned_text[3:]  # Remove ```
-                if cleaned_text.endswith('```'):
-                    cleaned_text = cleaned_text[:-3]  # Remove ```
-                cleaned_text = cleaned_text.strip()
-                
-                items = json.loads(cleaned_text)
+                items = json.loads(self._strip_code_fences(response_text))
                 print(f"✅ Successfully parsed {len(items)} items from vision model")
                 
                 return {
@@ -125,11 +175,13 @@ class OCRService:
                 print(f"🔍 Raw response: {response_text}")
                 
                 # Fallback to regex parsing if JSON fails
-                items = self._parse_receipt_text_fallback(response_text)
+                parsed = parse_receipt_text(response_text)
+                if parsed['subtotal_matches'] is False:
+                    print(f"⚠️ Parsed items total {parsed['items_total']} does not match printed subtotal {parsed['subtotal']}")
                 return {
                     'text': response_text,
-                    'confidence': 0.7,
-                    'items': items
+                    'confidence': 0.5 if parsed['subtotal_matches'] is False else 0.7,
+                    'items': parsed['items']
                 }
             
         except Exception as e:
@@ -140,72 +192,184 @@ class OCRService:
                 'items': []
             }
     
-    def _parse_receipt_text_fallback(self, text: str) -> List[Dict[str, Any]]:
+    def _split_into_tiles(self, image_data: bytes) -> List[bytes]:
         """
-        Fallback method using regex patterns to extract bill items
+        Split a tall, narrow receipt into overlapping horizontal JPEG tiles.
+        Other images are returned whole.
         """
-        lines = text.split('\n')
-        items = []
-        item_dict = {}  # To combine duplicate items
-        
-        # Skip common non-item lines
-        skip_words = ['total', 'subtotal', 'tax', 'tip', 'amount', 'change', 'cash', 'card', 
-                     'store', 'cashier', 'order', 'free', 'delivery', 'number', 'savings', 
-                     'points', 'trx', 'term', 'rtns', 'exch', 'final', 'days']
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            if not line:
-                i += 1
-                continue
-            
-            # Skip header lines and non-item lines
-            if any(word in line.lower() for word in skip_words):
-                i += 1
-                continue
-            
-            # Look for item name followed by price on next line
-            item_name = line
-            price = 0
-            quantity = 1
-            
-            # Check if next line has price
-            if i + 1 < len(lines):
-                next_line = lines[i + 1].strip()
-                # Pattern: "16.99 F" or "6.49 F"
-                price_match = re.match(r'^(\d+\.?\d*)\s*F?$', next_line)
-                if price_match:
-                    price = float(price_match.group(1))
-                    i += 2  # Skip both lines
-                else:
-                    i += 1
-            else:
-                i += 1
-            
-            # Skip if no valid price found
-            if price <= 0:
+        if Image is None:
+            return [image_data]
+        try:
+            with Image.open(io.BytesIO(image_data)) as image:
+                width, height = image.size
+                if width <= 0 or height / width <= TALL_ASPECT_RATIO:
+                    return [image_data]
+                
+                # Pick the tile count for the target tile shape, then size tiles to cover the image exactly
+                target_height = width * TILE_ASPECT_RATIO
+                count = math.ceil((height / target_height - TILE_OVERLAP) / (1 - TILE_OVERLAP))
+                count = max(2, min(count, MAX_TILES))
+                tile_height = math.ceil(height / (count - (count - 1) * TILE_OVERLAP))
+                step = tile_height * (1 - TILE_OVERLAP)
+                
+                image = image.convert('RGB')
+                tiles = []
+                for i in range(count):
+                    top = min(round(i * step), height - tile_height)
+                    buffer = io.BytesIO()
+                    image.crop((0, top, width, top + tile_height)).save(buffer, format='JPEG', quality=90)
+                    tiles.append(buffer.getvalue())
+                print(f"🔍 Split {width}x{height} receipt into {count} tiles of {tile_height}px")
+                return tiles
+        except Exception as e:
+            print(f"⚠️ Could not tile image, sending it whole: {str(e)}")
+            return [image_data]
+    
+    @staticmethod
+    def _to_number(value: Any) -> Optional[float]:
+        """
+        Read a model-returned amount such as 9, "9.00" or "$1,009.00"; None if it is not a number
+        """
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, str):
+            value = value.strip().lstrip('$').replace(',', '')
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None
+        return number if math.isfinite(number) else None
+    
+    def _normalize_tile_items(self, items: Any) -> List[Dict[str, Any]]:
+        """
+        Keep the items that have a name and a numeric price, with numeric quantities
+        """
+        normalized = []
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict):
                 continue
-            
-            # Clean up item name
-            item_name = ' '.join(item_name.split())
-            
-            # Skip if item name is too short or contains skip words
-            if len(item_name) < 3 or any(word in item_name.lower() for word in skip_words):
+            name = ' '.join(str(item.get('name') or '').split())
+            price = self._to_number(item.get('price'))
+            quantity = self._to_number(item.get('quantity'))
+            if not name or price is None:
                 continue
-            
-            # Combine duplicate items
-            if item_name in item_dict:
-                item_dict[item_name]['quantity'] += quantity
-            else:
-                item_dict[item_name] = {
-                    'name': item_name,
-                    'quantity': quantity,
-                    'price': price,
-                    'is_taxable': True
-                }
+            normalized.append({
+                **item,
+                'name': name,
+                'price': price,
+                'quantity': quantity if quantity is not None and quantity > 0 else 1,
+                'is_taxable': item.get('is_taxable', True) is not False
+            })
+        return normalized
+    
+    def _extract_tile(self, tile: bytes) -> Dict[str, Any]:
+        """
+        OCR one tile; returns its items and any printed subtotal or total (blocking)
+        """
+        response_text = self._call_vision_model(tile, TILE_PROMPT)
+        try:
+            data = json.loads(self._strip_code_fences(response_text))
+            if isinstance(data, list):
+                data = {'items': data}
+            return {
+                'items': self._normalize_tile_items(data.get('items')),
+                'subtotal': self._to_number(data.get('subtotal')),
+                'total': self._to_number(data.get('total'))
+            }
+        except (json.JSONDecodeError, AttributeError):
+            parsed = parse_receipt_text(response_text)
+            return {'items': parsed['items'], 'subtotal': parsed['subtotal'], 'total': parsed['total']}
+    
+    @staticmethod
+    def _item_key(item: Dict[str, Any]) -> tuple:
+        return (' '.join(str(item.get('name', '')).lower().split()),
+                round(float(item.get('price') or 0), 2),
+                float(item.get('quantity') or 1))
+    
+    def _merge_tile_items(self, tile_items: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Concatenate tile results in order, dropping items read twice in the
+        overlap: the longest run at the end of one tile that repeats at the
+        start of the next.
+        """
+        merged: List[Dict[str, Any]] = []
+        previous: List[tuple] = []
+        for items in tile_items:
+            keys = [self._item_key(item) for item in items]
+            overlap = 0
+            for k in range(min(len(previous), len(keys)), 0, -1):
+                if previous[-k:] == keys[:k]:
+                    overlap = k
+                    break
+            merged.extend(items[overlap:])
+            previous = keys
+        return merged
+    
+    async def _extract_tiled(self, tiles: List[bytes]) -> Dict[str, Any]:
+        """
+        OCR all tiles concurrently, merge them and check against the printed totals.
+        Latency is that of the slowest tile.
+        """
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self.executor, self._extract_tile, tile) for tile in tiles),
+            return_exceptions=True
+        )
+        
+        failed = [r for r in results if isinstance(r, Exception)]
+        for error in failed:
+            print(f"❌ Vision model tile error: {str(error)}")
+        succeeded = [r for r in results if not isinstance(r, Exception)]
+        if not succeeded:
+            return {'text': '', 'confidence': 0.0, 'items': []}
         
-        return list(item_dict.values())
+        try:
+            return self._merge_tile_results(succeeded, len(tiles), len(failed))
+        except Exception as e:
+            print(f"❌ Vision model error: {str(e)}")
+            return {
+                'text': '',
+                'confidence': 0.0,
+                'items': []
+            }
+    
+    def _merge_tile_results(self, succeeded: List[Dict[str, Any]], tile_count: int, failed_count: int) -> Dict[str, Any]:
+        """
+        Merge tile items in order and score them against the printed totals
+        """
+        items = self._merge_tile_items([r['items'] for r in succeeded])
+        subtotal = next((r['subtotal'] for r in reversed(succeeded) if r.get('subtotal')), None)
+        total = next((r['total'] for r in reversed(succeeded) if r.get('total')), None)
+        items_total = round(sum(float(i.get('quantity') or 1) * float(i.get('price') or 0) for i in items), 2)
+        
+        # Items should add up to the printed subtotal, and never exceed the total
+        if subtotal is not None:
+            matches = abs(items_total - float(subtotal)) <= 0.01
+        elif total is not None:
+            matches = items_total <= float(total) + 0.01
+        else:
+            matches = None
+        
+        confidence = 0.95 if matches else 0.85 if matches is None else 0.6
+        if failed_count:
+            confidence = min(confidence, 0.5)
+        text = f"Receipt processed by GPT-4 Vision in {tile_count} tiles"
+        if matches is False:
+            text += f"; items total {items_total} does not match printed {'subtotal' if subtotal is not None else 'total'} {subtotal if subtotal is not None else total}"
+            print(f"⚠️ {text}")
+        print(f"✅ Merged {len(items)} items from {len(succeeded)}/{tile_count} tiles")
+        
+        return {
+            'text': text,
+            'confidence': confidence,
+            'items': items
+        }
+    
+    def _parse_receipt_text(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Fallback method using regex patterns to extract bill items
+        """
+        return parse_receipt_items(text)
     
     async def is_available(self) -> bool:
         """
@@ -0,0 +1,52 @@
+import asyncio
+from typing import Dict, Set
+
+# Sent in place of queued messages when a subscriber falls too far behind
+RESYNC_MESSAGE = '{"type": "resync"}'
+
+
+class InMemoryPubSubHub:
+    """
+    In-process publish/subscribe hub keyed by channel.
+
+    Messages are pre-encoded strings so a publish is encoded once no matter
+    how many subscribers receive it. A shared broker (e.g. Redis pub/sub) can
+    replace this class by providing the same subscribe, unsubscribe and
+    publish methods.
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self.channels: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.channels.setdefault(channel, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        subscribers = self.channels.get(channel)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self.channels[channel]
+
+    def subscriber_count(self, channel: str) -> int:
+        return len(self.channels.get(channel, ()))
+
+    async def publish(self, channel: str, message: str) -> int:
+        """
+        Deliver a message to every subscriber of a channel without blocking
+        on slow consumers. Returns the number of subscribers reached.
+        """
+        subscribers = self.channels.get(channel, ())
+        for queue in subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Missed deltas cannot be replayed, so ask the client to resync
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_MESSAGE)
+        return len(subscribers)
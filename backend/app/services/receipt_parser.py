@@ -0,0 +1,166 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Common non-item lines (headers, totals, payment details). Free items need no
+# entry: zero-priced lines are dropped when items are added.
+SKIP_WORDS = ['total', 'subtotal', 'tax', 'tip', 'amount', 'change', 'cash', 'card',
+              'store', 'cashier', 'order', 'delivery', 'number', 'savings',
+              'points', 'trx', 'term', 'rtns', 'exch', 'final', 'days',
+              'visa', 'mastercard', 'amex', 'debit']
+
+# One combined matcher for every skip word instead of a substring scan per word.
+# Words must stand alone, so "Border Collie Toy" or "Tax-free item" stay items.
+SKIP_RE = re.compile(
+    r'(?<![\w-])(?:' + '|'.join(re.escape(word) for word in SKIP_WORDS) + r')(?![\w-])', re.IGNORECASE
+)
+
+# Trailing tax flags printed after the price ("16.99 F", "3.49 TX", "2.00 N")
+_TAX_FLAG = r'(?:\s+(?P<flag>TX|NT|FT|T|F|N|X|E|A|B|S))?'
+NON_TAXABLE_FLAGS = {'N', 'NT', 'E'}
+
+# "16.99 F" on its own line, following the item name
+PRICE_LINE_RE = re.compile(r'^\$?(?P<price>\d+(?:\.\d+)?)' + _TAX_FLAG + r'\s*$')
+
+# "2 x 3.49", "2 @ 3.49 6.98 F", optionally preceded by the item name
+MULTI_RE = re.compile(
+    r'^(?P<name>.*?)\s*(?P<qty>\d+(?:\.\d+)?)\s*[xX@*]\s*\$?(?P<unit>\d+(?:\.\d+)?)'
+    r'(?:\s+\$?(?P<total>\d+\.\d{2}))?' + _TAX_FLAG + r'\s*$'
+)
+
+# "Chapati    5  $2.50", "Paneer Tikka $12.99 F", "2x Burger 12.00". A quantity
+# column must be set off by column spacing; otherwise a number belongs to the
+# name ("Eggs 12 3.99", "Box of 6 4.99").
+ITEM_LINE_RE = re.compile(
+    r'^(?:(?P<lead_qty>\d+)\s*[xX]\s+)?(?P<name>.*?[A-Za-z].*?)'
+    r'(?:\s{2,}(?P<qty>\d+)\s{2,}|\s+)\$?(?P<price>\d+\.\d{2})' + _TAX_FLAG + r'\s*$'
+)
+
+# Printed subtotal / total, with the amount on the same line or the next one
+SUBTOTAL_RE = re.compile(r'sub\s*-?\s*total', re.IGNORECASE)
+TOTAL_RE = re.compile(r'^(?:grand\s+)?total\b', re.IGNORECASE)
+AMOUNT_RE = re.compile(r'\$?(\d+\.\d{2})\s*$')
+
+
+def _add_item(item_dict: Dict[Tuple[str, float], Dict[str, Any]], name: str,
+              quantity: float, price: float, flag: Optional[str]) -> None:
+    """
+    Add an item, summing quantities of duplicates that share a unit price
+    """
+    name = ' '.join(name.split())
+    if price <= 0 or quantity <= 0 or len(name) < 3:
+        return
+    if quantity == int(quantity):
+        quantity = int(quantity)
+
+    key = (name, price)
+    if key in item_dict:
+        item_dict[key]['quantity'] += quantity
+    else:
+        item_dict[key] = {
+            'name': name,
+            'quantity': quantity,
+            'price': price,
+            'is_taxable': flag not in NON_TAXABLE_FLAGS
+        }
+
+
+def parse_receipt_lines(lines: Iterable[str]) -> Dict[str, Any]:
+    """
+    Parse receipt lines in a single pass.
+
+    Supports the item name and price on one line (optionally with a quantity
+    column), the price on the line after the name, "2 x 3.49" / "2 @ 3.49"
+    quantity lines and trailing tax flags. Returns the items together with the
+    printed subtotal and total so callers can cross-check the result.
+    """
+    item_dict: Dict[Tuple[str, float], Dict[str, Any]] = {}
+    pending_name: Optional[str] = None
+    pending_label: Optional[str] = None
+    subtotal: Optional[float] = None
+    total: Optional[float] = None
+
+    for raw_line in lines:
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        # Skip header lines and non-item lines, keeping printed totals
+        if SKIP_RE.search(line) or SUBTOTAL_RE.search(line):
+            pending_name = None
+            label = 'subtotal' if SUBTOTAL_RE.search(line) else 'total' if TOTAL_RE.match(line) else None
+            amount_match = AMOUNT_RE.search(line)
+            if label and amount_match:
+                if label == 'subtotal':
+                    subtotal = float(amount_match.group(1))
+                elif total is None:
+                    total = float(amount_match.group(1))
+                pending_label = None
+            else:
+                pending_label = label or 'other'
+            continue
+
+        # Bare price: belongs to the previous name line or skipped label
+        price_match = PRICE_LINE_RE.match(line)
+        if price_match:
+            price = float(price_match.group('price'))
+            if pending_name:
+                _add_item(item_dict, pending_name, 1, price, price_match.group('flag'))
+            elif pending_label == 'subtotal':
+                subtotal = price
+            elif pending_label == 'total' and total is None:
+                total = price
+            pending_name = None
+            pending_label = None
+            continue
+        pending_label = None
+
+        multi_match = MULTI_RE.match(line)
+        if multi_match:
+            name = multi_match.group('name') or pending_name
+            if name and re.search(r'[A-Za-z]', name):
+                _add_item(item_dict, name, float(multi_match.group('qty')),
+                          float(multi_match.group('unit')), multi_match.group('flag'))
+            pending_name = None
+            continue
+
+        item_match = ITEM_LINE_RE.match(line)
+        if item_match:
+            price = float(item_match.group('price'))
+            quantity = float(item_match.group('qty') or 1)
+            lead_qty = item_match.group('lead_qty')
+            if lead_qty:
+                # A leading quantity is printed with the line total
+                quantity = float(lead_qty)
+                price = round(price / quantity, 2)
+            _add_item(item_dict, item_match.group('name'), quantity, price, item_match.group('flag'))
+            pending_name = None
+            continue
+
+        # Text only: may be the name for a price on the next line
+        pending_name = line
+
+    items = list(item_dict.values())
+    items_total = round(sum(item['quantity'] * item['price'] for item in items), 2)
+    subtotal_matches = abs(items_total - subtotal) <= 0.01 if subtotal is not None else None
+
+    return {
+        'items': items,
+        'items_total': items_total,
+        'subtotal': subtotal,
+        'total': total,
+        'subtotal_matches': subtotal_matches
+    }
+
+
+def parse_receipt_text(text: str) -> Dict[str, Any]:
+    """
+    Parse raw receipt text, see parse_receipt_lines
+    """
+    return parse_receipt_lines(text.splitlines())
+
+
+def parse_receipt_items(text: str) -> List[Dict[str, Any]]:
+    """
+    Parse raw receipt text and return only the items
+    """
+    return parse_receipt_text(text)['items']
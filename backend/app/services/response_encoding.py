@@ -0,0 +1,74 @@
+from typing import Dict, List, Any
+from fastapi.responses import JSONResponse, Response
+from app.models.schemas import AllocationResponse
+
+try:
+    import msgpack  # type: ignore
+except Exception:  # pragma: no cover
+    msgpack = None  # type: ignore
+
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+
+def to_columnar(response: AllocationResponse) -> Dict[str, Any]:
+    """
+    Columnar allocation result: item metadata is listed once and every
+    person x item share refers to it by index instead of repeating it
+    """
+    data = response.model_dump(mode='json')
+    item_index: Dict[str, int] = {}
+    items: Dict[str, List[Any]] = {
+        'item_id': [], 'item_name': [], 'price': [], 'original_price': [], 'original_currency': []
+    }
+    people: Dict[str, List[Any]] = {
+        'person_id': [], 'person_name': [], 'subtotal': [], 'tax_share': [], 'tip_share': [], 'total': [],
+        'currency': [], 'original_totals': []
+    }
+    shares: Dict[str, List[Any]] = {'person': [], 'item': [], 'quantity': [], 'subtotal': []}
+
+    for person_position, allocation in enumerate(data['allocations']):
+        for column in people:
+            people[column].append(allocation.get(column))
+        for share in allocation['items']:
+            key = share['item_id']
+            if key not in item_index:
+                item_index[key] = len(items['item_id'])
+                for column in items:
+                    items[column].append(share.get(column))
+            shares['person'].append(person_position)
+            shares['item'].append(item_index[key])
+            shares['quantity'].append(share['quantity'])
+            shares['subtotal'].append(share['subtotal'])
+
+    return {
+        'items': items,
+        'people': people,
+        'shares': shares,
+        'total_calculated': data['total_calculated'],
+        'total_expected': data['total_expected'],
+        'difference': data['difference'],
+        'currency': data.get('currency')
+    }
+
+
+def wants_msgpack(accept: str, format: str) -> bool:
+    return format == 'msgpack' or any(media_type in accept for media_type in MSGPACK_TYPES)
+
+
+def render_allocation(response: AllocationResponse, accept: str = '', format: str = 'json',
+                      shape: str = 'rows') -> Response:
+    """
+    Encode an allocation result as JSON or MessagePack, in row or columnar shape
+    """
+    if shape not in ('rows', 'columnar'):
+        raise ValueError("Shape must be rows or columnar")
+    if format not in ('json', 'msgpack'):
+        raise ValueError("Format must be json or msgpack")
+
+    # Amounts stay decimal strings in every encoding, as in the default JSON response
+    data = to_columnar(response) if shape == 'columnar' else response.model_dump(mode='json')
+    if wants_msgpack(accept, format):
+        if msgpack is None:
+            raise ValueError("MessagePack is not available on this server")
+        return Response(content=msgpack.packb(data), media_type='application/msgpack')
+    return JSONResponse(content=data)
@@ -0,0 +1,194 @@
+"""
+Measure allocations and peak memory of one large allocation request.
+
+Compares the former dict pipeline (model -> dicts -> share dicts ->
+re-validated PersonAllocation), kept here as a frozen copy of the original
+algorithm, with the typed records: first the allocation stage alone, then
+the full path from a validated AllocationRequest to the response.
+
+Run from the backend directory:
+    python -m benchmarks.bench_allocation_memory
+"""
+import asyncio
+import contextlib
+import io
+import time
+import tracemalloc
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from app.api.allocation import build_allocation_response
+from app.models.internal import Item, Participant, Rule
+from app.models.schemas import AllocationRequest, AllocationResponse, PersonAllocation
+from app.services.allocation_service import AllocationService
+
+ITEMS = 500
+PEOPLE = 50
+
+
+def build_request() -> AllocationRequest:
+    return AllocationRequest(
+        items=[{'id': f"item-{i}", 'name': f"Item {i}", 'quantity': PEOPLE, 'price': '4.25'} for i in range(ITEMS)],
+        people=[{'id': f"person-{i}", 'name': f"Person {i}"} for i in range(PEOPLE)],
+        rules=[{'id': f"rule-{i}", 'rule': 'takes', 'person_id': f"person-{i % PEOPLE}",
+                'item_name': f"Item {i}", 'quantity': 2, 'type': 'specific'} for i in range(0, ITEMS, 5)],
+        grand_total=str(round(ITEMS * PEOPLE * 4.25 * 1.26, 2)),
+    )
+
+
+def baseline_allocations(items: List[Dict[str, Any]], people: List[Dict[str, Any]], rules: List[Dict[str, Any]],
+                         tax_rate: float, tip_rate: float, grand_total: float) -> Dict[str, Any]:
+    """
+    The dict-based allocation as it was before the typed records, without its debug logging
+    """
+    allocations = [{'person_id': p['id'], 'person_name': p['name'], 'items': [], 'subtotal': 0.0,
+                    'tax_share': 0.0, 'tip_share': 0.0, 'total': 0.0} for p in people]
+    item_map = {item['name'].lower(): item for item in items}
+    allocated_quantities = {item['name'].lower(): 0 for item in items}
+
+    for rule in rules:
+        person = None
+        if 'person_id' in rule:
+            person = next((p for p in people if p['id'] == rule['person_id']), None)
+        elif 'person_name' in rule:
+            person = next((p for p in people if p['name'].lower() == rule['person_name'].lower()), None)
+        if not person:
+            continue
+        allocation = next((a for a in allocations if a['person_id'] == person['id']), None)
+        if not allocation:
+            continue
+        if rule['type'] == 'exclusive' and rule.get('item_name'):
+            item_name = rule['item_name'].lower()
+            item = item_map.get(item_name)
+            if item:
+                share = {'item_id': item['id'], 'item_name': item['name'], 'quantity': float(item['quantity']),
+                         'price': float(item['price']), 'subtotal': float(item['quantity']) * float(item['price'])}
+                allocation['items'].append(share)
+                allocation['subtotal'] += share['subtotal']
+                allocated_quantities[item_name] = item['quantity']
+        elif rule['type'] == 'specific' and rule.get('item_name') and rule.get('quantity'):
+            item_name = rule['item_name'].lower()
+            item = item_map.get(item_name)
+            if item:
+                current_allocated = allocated_quantities.get(item_name, 0)
+                quantity = min(rule['quantity'], item['quantity'] - current_allocated)
+                if quantity > 0:
+                    share = {'item_id': item['id'], 'item_name': item['name'], 'quantity': float(quantity),
+                             'price': float(item['price']), 'subtotal': float(quantity) * float(item['price'])}
+                    allocation['items'].append(share)
+                    allocation['subtotal'] += share['subtotal']
+                    allocated_quantities[item_name] = current_allocated + quantity
+
+    for item in items:
+        remaining_quantity = item['quantity'] - allocated_quantities.get(item['name'].lower(), 0)
+        if remaining_quantity > 0:
+            quantity_per_person = remaining_quantity // len(people)
+            remainder = remaining_quantity % len(people)
+            for i, person in enumerate(people):
+                allocation = next((a for a in allocations if a['person_id'] == person['id']), None)
+                quantity = quantity_per_person + (1 if i < remainder else 0)
+                if allocation and quantity > 0:
+                    share = {'item_id': item['id'], 'item_name': item['name'], 'quantity': float(quantity),
+                             'price': float(item['price']), 'subtotal': float(quantity) * float(item['price'])}
+                    allocation['items'].append(share)
+                    allocation['subtotal'] += share['subtotal']
+
+    total_subtotal = sum(a['subtotal'] for a in allocations)
+    total_tax = grand_total * tax_rate / (1 + tax_rate)
+    total_tip = grand_total * tip_rate / (1 + tip_rate)
+    for allocation in allocations:
+        if total_subtotal > 0:
+            proportion = allocation['subtotal'] / total_subtotal
+            allocation['tax_share'] = round(total_tax * proportion, 2)
+            allocation['tip_share'] = round(total_tip * proportion, 2)
+        allocation['total'] = round(allocation['subtotal'] + allocation['tax_share'] + allocation['tip_share'], 2)
+
+    total_calculated = sum(a['total'] for a in allocations)
+    difference = grand_total - total_calculated
+    if abs(difference) > 0.01:
+        largest_allocation = max(allocations, key=lambda x: x['total'])
+        largest_allocation['total'] = round(largest_allocation['total'] + difference, 2)
+        total_calculated = sum(a['total'] for a in allocations)
+    return {'allocations': allocations, 'total_calculated': total_calculated, 'difference': difference}
+
+
+def baseline_response(request: AllocationRequest) -> AllocationResponse:
+    """
+    The former endpoint body: dicts in, every result re-validated on the way out
+    """
+    result = baseline_allocations(
+        items=[item.dict() for item in request.items],
+        people=[person.dict() for person in request.people],
+        rules=[rule.dict() for rule in request.rules],
+        tax_rate=request.tax_rate,
+        tip_rate=request.tip_rate,
+        grand_total=float(request.grand_total)
+    )
+    return AllocationResponse(
+        allocations=[PersonAllocation(
+            person_id=a['person_id'], person_name=a['person_name'], items=a['items'],
+            subtotal=Decimal(str(a['subtotal'])), tax_share=Decimal(str(a['tax_share'])),
+            tip_share=Decimal(str(a['tip_share'])), total=Decimal(str(a['total']))
+        ) for a in result['allocations']],
+        total_calculated=Decimal(str(result['total_calculated'])),
+        total_expected=request.grand_total,
+        difference=Decimal(str(result['difference']))
+    )
+
+
+def measure(fn):
+    """
+    Run fn once under tracemalloc; returns (result, peak bytes, live blocks held, seconds)
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+        tracemalloc.start()
+        before_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        after_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+        tracemalloc.stop()
+    return result, peak, after_blocks - before_blocks, elapsed
+
+
+def report(label: str, peak: int, blocks: int, elapsed: float) -> None:
+    print(f"{label:<22} peak {peak / 1024 / 1024:6.1f} MiB  {blocks:>9,} live allocations  "
+          f"{elapsed * 1000:6.0f} ms (traced)")
+
+
+def main() -> None:
+    request = build_request()
+    service = AllocationService()
+    args = dict(tax_rate=request.tax_rate, tip_rate=request.tip_rate, grand_total=float(request.grand_total))
+    print(f"{ITEMS} items x {PEOPLE} people, {len(request.rules)} rules")
+
+    def dict_stage():
+        return baseline_allocations(
+            items=[item.dict() for item in request.items],
+            people=[person.dict() for person in request.people],
+            rules=[rule.dict() for rule in request.rules],
+            **args
+        )
+
+    def typed_stage():
+        return service.allocate(
+            items=[Item.from_model(item) for item in request.items],
+            people=[Participant(person.id, person.name) for person in request.people],
+            rules=[Rule.from_model(rule) for rule in request.rules],
+            **args
+        )
+
+    _, peak, blocks, elapsed = measure(dict_stage)
+    report("allocation, baseline", peak, blocks, elapsed)
+    _, peak, blocks, elapsed = measure(typed_stage)
+    report("allocation, typed", peak, blocks, elapsed)
+    _, peak, blocks, elapsed = measure(lambda: baseline_response(request))
+    report("response, baseline", peak, blocks, elapsed)
+    _, peak, blocks, elapsed = measure(lambda: asyncio.run(build_allocation_response(request)))
+    report("response, typed", peak, blocks, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark delta fan-out latency for a bill session at 2, 20 and 200 subscribers.
+
+Measures the time from an edit being applied until every subscriber's queue
+has received the broadcast, through the in-process pub/sub hub.
+
+Run from the backend directory:
+    python -m benchmarks.bench_bill_session_fanout
+"""
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+
+from app.services.bill_session_service import BillSessionService
+
+SUBSCRIBERS = [2, 20, 200]
+EDITS = 200
+PEOPLE = 10
+ITEMS = 30
+
+
+def setup_ops():
+    ops = [{'op': 'set_person', 'person': {'id': f"p{i}", 'name': f"Person {i}"}} for i in range(PEOPLE)]
+    ops += [{'op': 'set_item', 'item': {'id': f"i{i}", 'name': f"Item {i}", 'quantity': 2, 'price': 5}}
+            for i in range(ITEMS)]
+    ops.append({'op': 'set_field', 'field': 'grand_total', 'value': ITEMS * 10 * 1.26})
+    return ops
+
+
+async def run(subscribers: int):
+    service = BillSessionService()
+    queues = [service.hub.subscribe('bench') for _ in range(subscribers)]
+    await service.apply_ops('bench', setup_ops())
+    for queue in queues:
+        queue.get_nowait()
+
+    async def drain(queue):
+        await queue.get()
+        return time.perf_counter()
+
+    apply_ms, fanout_ms = [], []
+    for n in range(EDITS):
+        receivers = [asyncio.create_task(drain(q)) for q in queues]
+        await asyncio.sleep(0)
+        op = {'op': 'set_rule', 'rule': {'id': 'r', 'rule': 'edit', 'person_id': f"p{n % PEOPLE}",
+                                         'item_name': f"Item {n % ITEMS}", 'quantity': 1, 'type': 'specific'}}
+        start = time.perf_counter()
+        await service.apply_ops('bench', [op])
+        published = time.perf_counter()
+        received = await asyncio.gather(*receivers)
+        apply_ms.append((published - start) * 1000)
+        fanout_ms.append((max(received) - published) * 1000)
+    return statistics.median(apply_ms), statistics.median(fanout_ms), max(fanout_ms)
+
+
+def main() -> None:
+    for subscribers in SUBSCRIBERS:
+        # The allocation service logs every calculation; keep the output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            apply_ms, fanout_p50, fanout_max = asyncio.run(run(subscribers))
+        print(f"{subscribers:>4} subscribers: recompute+publish p50 {apply_ms:.3f} ms, "
+              f"fan-out p50 {fanout_p50:.3f} ms, max {fanout_max:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
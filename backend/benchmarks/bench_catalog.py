@@ -0,0 +1,68 @@
+"""
+Benchmark the merchant item catalog at 1M entries: build, merge, on-disk
+size, load time and exact / fuzzy lookup latency.
+
+Run from the backend directory:
+    python -m benchmarks.bench_catalog
+"""
+import os
+import random
+import tempfile
+import time
+
+from app.services.catalog_service import CatalogIndex, CatalogService, hash64, normalize
+
+MERCHANTS = 10_000
+ITEMS_PER_MERCHANT = 100
+QUERIES = 100_000
+FUZZY_QUERIES = 1_000
+
+
+def entries(rng: random.Random):
+    for m in range(MERCHANTS):
+        for i in range(ITEMS_PER_MERCHANT):
+            yield f"Merchant {m}", f"Menu item {i} special", rng.randint(100, 5000), 1
+
+
+def main() -> None:
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog')
+
+        start = time.perf_counter()
+        index = CatalogIndex.build(entries(rng))
+        print(f"build {len(index)} entries: {time.perf_counter() - start:.2f} s")
+
+        extra = CatalogIndex.build(
+            (f"Merchant {m}", f"Menu item {i} special", 999, 1)
+            for m in range(0, MERCHANTS, 10) for i in range(ITEMS_PER_MERCHANT)
+        )
+        start = time.perf_counter()
+        merged = index.merge(extra)
+        print(f"merge {len(extra)} entries: {time.perf_counter() - start:.2f} s")
+
+        merged.save(path)
+        size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        print(f"on disk: {size / 2 ** 20:.1f} MiB")
+
+        start = time.perf_counter()
+        service = CatalogService(path=path)
+        print(f"load (mmap): {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+        keys = [(hash64(normalize(f"Merchant {rng.randrange(MERCHANTS)}")),
+                 hash64(normalize(f"Menu item {rng.randrange(ITEMS_PER_MERCHANT)} special")))
+                for _ in range(QUERIES)]
+        start = time.perf_counter()
+        for merchant_hash, name_hash in keys:
+            service.index.lookup(merchant_hash, name_hash)
+        print(f"exact lookup: {(time.perf_counter() - start) / QUERIES * 1e6:.2f} us")
+
+        start = time.perf_counter()
+        for _ in range(FUZZY_QUERIES):
+            service.match_item(f"Merchant {rng.randrange(MERCHANTS)}",
+                               {'name': f"Menu itern {rng.randrange(ITEMS_PER_MERCHANT)} special", 'price': 9.99})
+        print(f"fuzzy match: {(time.perf_counter() - start) / FUZZY_QUERIES * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark export memory: peak traced memory while streaming 1k, 10k and
+100k bills should stay flat, since bills are allocated and encoded chunk by
+chunk and the output is discarded as it would be sent to the client.
+
+Run from the backend directory:
+    python -m benchmarks.bench_export
+"""
+import contextlib
+import os
+import time
+import tracemalloc
+
+from app.models.schemas import AllocationRequest
+from app.services.bill_store import BillStore
+from app.services.export_service import ExportService
+
+SIZES = [1_000, 10_000, 100_000]
+FORMATS = ['csv', 'ndjson', 'parquet']
+
+
+def build_bill(i: int) -> AllocationRequest:
+    return AllocationRequest(
+        items=[{'id': f"{i}-{n}", 'name': f"Item {n}", 'quantity': 3, 'price': '6.50'} for n in range(4)],
+        people=[{'id': f"p{n}", 'name': f"Person {n}"} for n in range(3)],
+        rules=[],
+        grand_total='98.28',
+    )
+
+
+def main() -> None:
+    store = BillStore()
+    service = ExportService(store)
+    # The allocation service logs every bill; send it nowhere during the run
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        results = []
+        for size in SIZES:
+            while len(store.bills) < size:
+                store.put('group', f"bill-{len(store.bills)}", 'p0', build_bill(len(store.bills)))
+            for format in FORMATS:
+                tracemalloc.start()
+                start = time.perf_counter()
+                sent = sum(len(chunk) for chunk in service.stream(format))
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                results.append((size, format, sent, peak, elapsed))
+
+    for size, format, sent, peak, elapsed in results:
+        print(f"{size:>7} bills {format:<8} {sent / 1024 / 1024:7.1f} MiB sent  "
+              f"peak {peak / 1024 / 1024:5.2f} MiB  {size / elapsed:8,.0f} bills/s (traced)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Benchmark balance query latency as a group ledger grows to 1M entries.
+
+Run from the backend directory:
+    python -m benchmarks.bench_ledger
+"""
+import random
+import time
+
+from app.services.ledger_service import LedgerService
+
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+PEOPLE = [f"person-{i}" for i in range(8)]
+QUERIES = 100_000
+
+
+def main() -> None:
+    rng = random.Random(0)
+    service = LedgerService()
+    entries = 0
+
+    for size in SIZES:
+        while entries < size:
+            payer, other = rng.sample(PEOPLE, 2)
+            allocations = [
+                {'person_id': payer, 'total': rng.randint(100, 5000) / 100},
+                {'person_id': other, 'total': rng.randint(100, 5000) / 100},
+            ]
+            service.record_bill('group', f"bill-{entries}", payer, allocations)
+            entries += 1
+
+        start = time.perf_counter()
+        for i in range(QUERIES):
+            service.get_balance('group', PEOPLE[i % len(PEOPLE)])
+        per_query = (time.perf_counter() - start) / QUERIES
+
+        start = time.perf_counter()
+        service.get_balances('group')
+        all_balances = time.perf_counter() - start
+
+        print(f"{size:>9} entries: get_balance {per_query * 1e9:.0f} ns, "
+              f"get_balances {all_balances * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
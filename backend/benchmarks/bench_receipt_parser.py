@@ -0,0 +1,51 @@
+"""
+Benchmark the receipt text parser on a 10k-line receipt.
+
+Run from the backend directory:
+    python -m benchmarks.bench_receipt_parser
+"""
+import random
+import time
+
+from app.services.receipt_parser import parse_receipt_text
+
+LINES = 10_000
+RUNS = 10
+
+
+def build_receipt(lines: int, seed: int = 0) -> str:
+    """
+    Build a synthetic receipt mixing every supported layout
+    """
+    rng = random.Random(seed)
+    out = []
+    while len(out) < lines:
+        name = f"ITEM {rng.randint(1, 500)}"
+        price = rng.randint(100, 2000) / 100
+        layout = rng.randrange(4)
+        if layout == 0:
+            out += [name, f"{price:.2f} F"]
+        elif layout == 1:
+            out.append(f"{name}    ${price:.2f} T")
+        elif layout == 2:
+            out += [name, f"{rng.randint(2, 5)} @ {price:.2f}"]
+        else:
+            out += [f"Store #{rng.randint(1, 99)}", f"TAX {price:.2f}"]
+    return '\n'.join(out[:lines])
+
+
+def main() -> None:
+    text = build_receipt(LINES)
+    parse_receipt_text(text)
+
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        result = parse_receipt_text(text)
+    elapsed = (time.perf_counter() - start) / RUNS
+
+    print(f"{LINES} lines: {elapsed * 1000:.2f} ms/parse, "
+          f"{LINES / elapsed:,.0f} lines/s, {len(result['items'])} distinct items")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compare bytes on the wire and client-perceived latency of allocation
+response encodings for a 300-item, 40-person catered event.
+
+Latency is estimated as server encode time + transfer over a slow mobile
+link + client decode time.
+
+Run from the backend directory:
+    python -m benchmarks.bench_response_encoding
+"""
+import asyncio
+import contextlib
+import gzip
+import io
+import json
+import time
+
+import brotli
+import msgpack
+
+from app.api.allocation import build_allocation_response
+from app.models.schemas import AllocationRequest
+from app.services.response_encoding import to_columnar
+
+ITEMS = 300
+PEOPLE = 40
+LINK_BYTES_PER_S = 1_000_000 / 8  # 1 Mbit/s
+LINK_RTT_S = 0.15
+RUNS = 5
+
+
+def build_request() -> AllocationRequest:
+    return AllocationRequest(
+        items=[{'id': f"item-{i}", 'name': f"Catered dish number {i}", 'quantity': PEOPLE, 'price': '3.75'}
+               for i in range(ITEMS)],
+        people=[{'id': f"person-{i}", 'name': f"Guest {i}"} for i in range(PEOPLE)],
+        rules=[],
+        grand_total=str(round(ITEMS * PEOPLE * 3.75 * 1.26, 2)),
+    )
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        result = fn(*args)
+    return result, (time.perf_counter() - start) / RUNS
+
+
+def main() -> None:
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = asyncio.run(build_allocation_response(build_request()))
+    rows = response.model_dump(mode='json')
+    columnar = to_columnar(response)
+
+    encodings = {
+        'json': lambda d: json.dumps(d).encode(),
+        'json+gzip': lambda d: gzip.compress(json.dumps(d).encode(), 6),
+        'json+br': lambda d: brotli.compress(json.dumps(d).encode(), quality=4),
+        'msgpack': msgpack.packb,
+        'msgpack+gzip': lambda d: gzip.compress(msgpack.packb(d), 6),
+    }
+    decoders = {
+        'json': lambda b: json.loads(b),
+        'json+gzip': lambda b: json.loads(gzip.decompress(b)),
+        'json+br': lambda b: json.loads(brotli.decompress(b)),
+        'msgpack': msgpack.unpackb,
+        'msgpack+gzip': lambda b: msgpack.unpackb(gzip.decompress(b)),
+    }
+
+    print(f"{ITEMS} items x {PEOPLE} people, link {LINK_BYTES_PER_S * 8 / 1e6:.0f} Mbit/s, RTT {LINK_RTT_S * 1000:.0f} ms")
+    for shape, data in (('rows', rows), ('columnar', columnar)):
+        for name, encode in encodings.items():
+            body, encode_s = timed(encode, data)
+            _, decode_s = timed(decoders[name], body)
+            transfer_s = LINK_RTT_S + len(body) / LINK_BYTES_PER_S
+            total_ms = (encode_s + transfer_s + decode_s) * 1000
+            print(f"{shape:>8} {name:<13} {len(body):>10,} B  encode {encode_s * 1000:6.1f} ms  "
+                  f"decode {decode_s * 1000:6.1f} ms  perceived {total_ms:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
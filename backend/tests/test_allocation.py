@@ -77,3 +77,28 @@ def test_calculate_allocations():
     bob_allocation = next(a for a in result['allocations'] if a['person_name'] == 'Bob')
     assert len(bob_allocation['items']) == 1
     assert bob_allocation['items'][0]['item_name'] == 'Chapati'
+
+def test_allocate_typed_records():
+    """Test the typed allocation core against hand-computed splits"""
+    from app.models.internal import Item, Participant, Rule
+    service = AllocationService()
+    chapati = Item.create('1', 'Chapati', 5, 2.50)
+    paneer = Item.create('2', 'Paneer', 1, 12.99)
+
+    result = service.allocate(
+        [chapati, paneer],
+        [Participant('1', 'Alice'), Participant('2', 'Bob')],
+        [Rule('specific', '2', None, 'chapati', 2)],
+        0.08, 0.18, 30.0
+    )
+
+    alice, bob = result.allocations
+    assert [(s.item.name, s.quantity, s.subtotal) for s in alice.shares] == [('Chapati', 2, 5.0), ('Paneer', 1, 12.99)]
+    assert [(s.item.name, s.quantity, s.subtotal) for s in bob.shares] == [('Chapati', 2, 5.0), ('Chapati', 1, 2.5)]
+    assert (alice.subtotal, alice.tax_share, alice.tip_share) == (pytest.approx(17.99), 1.57, 3.23)
+    assert (bob.subtotal, bob.tax_share, bob.tip_share) == (7.5, 0.65, 1.35)
+    # Alice has the largest total and absorbs the rounding difference of -2.29
+    assert (alice.total, bob.total) == (20.5, 9.5)
+    assert result.total_calculated == pytest.approx(30.0)
+    # Shares reference the items instead of copying them
+    assert bob.shares[0].item is chapati
@@ -0,0 +1,128 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import sessions
+from app.models.internal import Item
+from app.services.bill_session_service import BillSessionService
+
+SETUP_OPS = [
+    {'op': 'set_person', 'person': {'id': 'p1', 'name': 'Alice'}},
+    {'op': 'set_person', 'person': {'id': 'p2', 'name': 'Bob'}},
+    {'op': 'set_item', 'item': {'id': 'i1', 'name': 'Naan', 'quantity': 2, 'price': 5}},
+    {'op': 'set_field', 'field': 'tax_rate', 'value': 0},
+    {'op': 'set_field', 'field': 'tip_rate', 'value': 0},
+    {'op': 'set_field', 'field': 'grand_total', 'value': 10},
+]
+
+@pytest.mark.asyncio
+async def test_delta_contains_only_changed_allocations():
+    """Test that an edit affecting one person broadcasts only that person"""
+    service = BillSessionService()
+    queue = service.hub.subscribe('bill')
+
+    first = await service.apply_ops('bill', SETUP_OPS)
+    assert {a['person_id'] for a in first['changed']} == {'p1', 'p2'}
+    assert isinstance(service.get_session('bill').items['i1'], Item)
+    assert service.get_session('bill').snapshot()['items'][0]['price'] == 5.0
+
+    delta = await service.apply_ops('bill', [
+        {'op': 'set_item', 'item': {'id': 'i2', 'name': 'Lassi', 'quantity': 1, 'price': 4}},
+        {'op': 'set_rule', 'rule': {'id': 'r1', 'rule': 'Bob takes lassi', 'person_id': 'p2',
+                                    'item_name': 'Lassi', 'type': 'exclusive'}},
+        {'op': 'set_field', 'field': 'grand_total', 'value': 14},
+    ])
+    assert [a['person_id'] for a in delta['changed']] == ['p2']
+    assert delta['version'] == 2
+    assert queue.qsize() == 2
+
+@pytest.mark.asyncio
+async def test_invalid_batch_is_rolled_back():
+    """Test that a batch with an invalid op leaves the session unchanged"""
+    service = BillSessionService()
+    await service.apply_ops('bill', SETUP_OPS)
+
+    with pytest.raises(ValueError):
+        await service.apply_ops('bill', [{'op': 'remove_item', 'id': 'i1'}, {'op': 'explode'}])
+
+    session = service.get_session('bill')
+    assert 'i1' in session.items
+    assert session.version == 1
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("field,value", [('tax_rate', -1), ('tip_rate', 1.5), ('grand_total', -5), ('tax_rate', 'nan')])
+async def test_out_of_range_field_is_rejected(field, value):
+    """Test that bill fields are held to the AllocationRequest bounds"""
+    service = BillSessionService()
+    await service.apply_ops('bill', SETUP_OPS)
+
+    with pytest.raises(ValueError):
+        await service.apply_ops('bill', [{'op': 'set_field', 'field': field, 'value': value}])
+
+    session = service.get_session('bill')
+    assert session.fields == {'tax_rate': 0, 'tip_rate': 0, 'grand_total': 10}
+    assert session.version == 1
+
+@pytest.mark.asyncio
+async def test_item_currency_is_rejected():
+    """Test that session items cannot mix currencies, since sessions do not convert"""
+    service = BillSessionService()
+    await service.apply_ops('bill', SETUP_OPS)
+
+    with pytest.raises(ValueError, match='currencies'):
+        await service.apply_ops('bill', [
+            {'op': 'set_item', 'item': {'id': 'i2', 'name': 'Sushi', 'quantity': 1, 'price': 3000, 'currency': 'JPY'}},
+        ])
+
+    assert list(service.get_session('bill').items) == ['i1']
+
+@pytest.mark.asyncio
+async def test_failed_recalculation_is_rolled_back(monkeypatch):
+    """Test that a batch of valid ops that cannot be allocated leaves the session unchanged"""
+    service = BillSessionService()
+    queue = service.hub.subscribe('bill')
+    await service.apply_ops('bill', SETUP_OPS)
+    allocations = service.get_session('bill').allocations
+
+    def fail(**kwargs):
+        raise ZeroDivisionError('division by zero')
+    monkeypatch.setattr(service.allocation_service, 'allocate', fail)
+
+    with pytest.raises(ZeroDivisionError):
+        await service.apply_ops('bill', [
+            {'op': 'remove_item', 'id': 'i1'},
+            {'op': 'set_item', 'item': {'id': 'i2', 'name': 'Lassi', 'quantity': 1, 'price': 4}},
+        ])
+
+    session = service.get_session('bill')
+    assert list(session.items) == ['i1']
+    assert session.allocations == allocations
+    assert session.version == 1
+    assert queue.qsize() == 1
+
+def test_websocket_broadcast():
+    """Test that edits from one client reach every subscriber"""
+    client = TestClient(app)
+    with client.websocket_connect('/ws/bills/ws-test') as alice, \
+            client.websocket_connect('/ws/bills/ws-test') as bob:
+        assert alice.receive_json()['type'] == 'snapshot'
+        assert bob.receive_json()['type'] == 'snapshot'
+
+        alice.send_json({'ops': SETUP_OPS})
+
+        for ws in (alice, bob):
+            delta = ws.receive_json()
+            assert delta['type'] == 'delta'
+            assert len(delta['changed']) == 2
+
+def test_session_released_after_last_subscriber():
+    """Test that a bill session is dropped when its last client disconnects"""
+    client = TestClient(app)
+    with client.websocket_connect('/ws/bills/ws-release') as alice:
+        alice.receive_json()
+        with client.websocket_connect('/ws/bills/ws-release') as bob:
+            bob.receive_json()
+        alice.send_json({'ops': SETUP_OPS})
+        assert alice.receive_json()['type'] == 'delta'
+        assert 'ws-release' in sessions.bill_session_service.sessions
+
+    assert 'ws-release' not in sessions.bill_session_service.sessions
@@ -0,0 +1,133 @@
+import io
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import catalog, ocr, uploads
+from app.services.catalog_service import CatalogService, CatalogIndex, is_likely_misread
+from app.services.image_storage import ImageStorageService
+
+MENU = [
+    {'name': 'Paneer Tikka', 'price': 12.99},
+    {'name': 'Garlic Naan', 'price': 3.50},
+    {'name': 'Mango Lassi', 'price': 4.25},
+]
+
+@pytest.fixture
+def service(tmp_path):
+    service = CatalogService(path=str(tmp_path / 'catalog'), flush_size=1000)
+    service.learn('Spice Route', MENU)
+    service.learn('Spice Route', MENU[:1])
+    return service
+
+def test_is_likely_misread():
+    """Test which price differences look like OCR errors"""
+    assert is_likely_misread(899, 399)
+    assert is_likely_misread(130, 1300)
+    assert not is_likely_misread(1499, 1350)
+
+def test_match_before_and_after_flush(service):
+    """Test that lookups agree on pending and persisted entries"""
+    item = {'name': 'PANEER  TIKKA', 'price': 12.99}
+    assert service.match_item('spice route', item)['status'] == 'exact'
+
+    service.flush()
+    assert len(service.index) == 3
+    assert service.pending == {}
+    match = service.match_item('Spice Route', item)
+    assert match == {'status': 'exact', 'name': 'Paneer Tikka', 'price': 12.99, 'known_price': 12.99}
+
+    reloaded = CatalogService(path=service.path)
+    assert reloaded.match_item('Spice Route', item)['status'] == 'exact'
+    assert reloaded.match_item('Other Place', item)['status'] == 'unknown'
+
+def test_flush_merges_counts(service):
+    """Test that repeated confirmations are folded into one entry"""
+    service.flush()
+    service.learn('Spice Route', [{'name': 'Paneer Tikka', 'price': 13.49}])
+    service.flush()
+
+    index = service.index
+    assert len(index) == 4
+    assert sorted(int(c) for c in index.columns['count']) == [1, 1, 1, 2]
+    # The most confirmed price wins
+    assert service.match_item('Spice Route', {'name': 'Paneer Tikka', 'price': 13.49})['known_price'] == 12.99
+
+def test_learn_during_flush_is_kept(service, monkeypatch):
+    """Test that confirmations arriving while a flush is building are neither lost nor hidden"""
+    build = CatalogIndex.build.__func__
+
+    def build_while_learning(cls, entries):
+        service.learn('Spice Route', [{'name': 'Chai', 'price': 2.00}])
+        assert service.match_item('Spice Route', {'name': 'Garlic Naan', 'price': 3.50})['status'] == 'exact'
+        return build(cls, entries)
+    monkeypatch.setattr(CatalogIndex, 'build', classmethod(build_while_learning))
+
+    service.flush()
+
+    assert len(service.index) == 3
+    assert list(service.pending) == [('spice route', 'chai')]
+    assert service.pending_count == 1
+    assert service.match_item('Spice Route', {'name': 'Chai', 'price': 2.00})['status'] == 'exact'
+
+def test_failed_flush_keeps_pending(service, monkeypatch):
+    """Test that a flush that cannot be saved keeps its confirmations for the next one"""
+    def fail(self, path):
+        raise OSError('disk full')
+    monkeypatch.setattr(CatalogIndex, 'save', fail)
+
+    with pytest.raises(OSError):
+        service.flush()
+
+    assert service.pending_count == 3
+    assert service.pending[('spice route', 'paneer tikka')] == {1299: ['Paneer Tikka', 2]}
+
+def test_is_confident_requires_matching_subtotal(service):
+    """Test that a local parse is only trusted when it adds up to the printed subtotal"""
+    items = [{'name': 'Paneer Tikka', 'price': 12.99, 'quantity': 1}]
+
+    assert service.is_confident('Spice Route', {'items': items, 'subtotal_matches': True})
+    assert not service.is_confident('Spice Route', {'items': items, 'subtotal_matches': None})
+    assert not service.is_confident('Spice Route', {'items': items, 'subtotal_matches': False})
+
+def test_apply_snaps_and_flags(service):
+    """Test that misread names and prices are corrected and flagged"""
+    service.flush()
+    items = [
+        {'id': '1', 'name': 'Paneer Tikxa', 'price': 12.99},
+        {'id': '2', 'name': 'Garlic Naan', 'price': 8.50},
+        {'id': '3', 'name': 'Mango Lassi', 'price': 5.95},
+        {'id': '4', 'name': 'Chai', 'price': 2.00},
+    ]
+
+    flags = service.apply('Spice Route', items)
+
+    assert [(f['item_id'], f['status']) for f in flags] == [
+        ('1', 'name_corrected'), ('2', 'price_misread'), ('3', 'price_changed')
+    ]
+    assert items[0]['name'] == 'Paneer Tikka'
+    assert items[1]['price'] == 3.50
+    assert items[2]['price'] == 5.95
+    assert items[3] == {'id': '4', 'name': 'Chai', 'price': 2.00}
+
+def test_confident_local_parse_skips_vision(service, tmp_path, monkeypatch):
+    """Test that a fully recognized on-device parse does not call the vision model"""
+    storage = ImageStorageService(root=str(tmp_path / 'uploads'), max_bytes=10 * 1024 * 1024)
+    monkeypatch.setattr(uploads, 'image_storage', storage)
+    monkeypatch.setattr(ocr, 'image_storage', storage)
+    monkeypatch.setattr(catalog, 'catalog_service', service)
+    monkeypatch.setattr(ocr, 'catalog_service', service)
+
+    async def fail(file):
+        raise AssertionError('vision model should not be called')
+    monkeypatch.setattr(ocr.ocr_service, 'extract_text', fail)
+
+    response = TestClient(app).post(
+        '/api/ocr/extract',
+        files={'file': ('receipt.jpg', io.BytesIO(b'\xff\xd8 not really a jpeg'), 'image/jpeg')},
+        data={'merchant': 'Spice Route', 'text': 'Paneer Tikka 12.99\nGarlic Naan 2 x 3.50\nSubtotal 19.99'},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data['source'] == 'local'
+    assert [i['name'] for i in data['items']] == ['Paneer Tikka', 'Garlic Naan']
@@ -0,0 +1,95 @@
+import json
+from decimal import Decimal
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import allocation
+from app.services.currency_service import RateProvider, CurrencyService
+
+RATES = {'base': 'USD', 'rates': {'EUR': 0.5, 'JPY': 150.0, 'KWD': 0.3}}
+
+@pytest.fixture
+def provider():
+    provider = RateProvider(path='', ttl_seconds=60)
+    provider.load_table(RATES)
+    return provider
+
+def test_convert_rounds_per_target_currency(provider):
+    """Test vectorized conversion with each currency's minor unit"""
+    converted = provider.convert([10, 1.234, 1], ['EUR', 'USD', 'USD'], ['JPY', 'KWD', 'EUR'])
+
+    assert list(converted) == [3000.0, 0.37, 0.5]
+
+def test_convert_rounds_half_up(provider):
+    """Test that conversions landing exactly between two cents round up"""
+    converted = provider.convert([2.25, 0.25, 0.01], ['USD'] * 3, 'EUR')
+
+    assert list(converted) == [1.13, 0.13, 0.01]
+
+def test_convert_unknown_currency(provider):
+    """Test that a missing rate is reported"""
+    with pytest.raises(ValueError, match='GBP'):
+        provider.convert([1], ['GBP'], 'USD')
+
+def test_rate_table_cache_expires(tmp_path):
+    """Test that the rate table is reloaded from disk after it expires"""
+    path = tmp_path / 'rates.json'
+    path.write_text(json.dumps(RATES))
+    provider = RateProvider(path=str(path), ttl_seconds=3600)
+    assert provider.get_rates()['EUR'] == 0.5
+
+    path.write_text(json.dumps({'base': 'USD', 'rates': {'EUR': 0.6}}))
+    assert provider.get_rates()['EUR'] == 0.5
+    provider.ttl_seconds = 0
+    assert provider.get_rates()['EUR'] == 0.6
+
+def test_calculate_allocation_mixed_currencies(provider, monkeypatch):
+    """Test that results are reported in the settlement and original currencies"""
+    monkeypatch.setattr(allocation, 'currency_service', CurrencyService(provider))
+    client = TestClient(app)
+
+    response = client.post('/api/allocation/calculate', json={
+        'items': [
+            {'id': '1', 'name': 'Pasta', 'quantity': 1, 'price': '10', 'currency': 'EUR'},
+            {'id': '2', 'name': 'Sushi', 'quantity': 1, 'price': '3000', 'currency': 'JPY'},
+        ],
+        'people': [{'id': 'a', 'name': 'Alice'}, {'id': 'b', 'name': 'Bob'}],
+        'rules': [
+            {'id': 'r1', 'rule': 'Alice takes pasta', 'person_id': 'a', 'item_name': 'Pasta', 'type': 'exclusive'},
+            {'id': 'r2', 'rule': 'Bob takes sushi', 'person_id': 'b', 'item_name': 'Sushi', 'type': 'exclusive'},
+        ],
+        'tax_rate': 0,
+        'tip_rate': 0,
+        'grand_total': '40',
+        'currency': 'USD',
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data['currency'] == 'USD'
+    alice, bob = data['allocations']
+    assert Decimal(alice['total']) == Decimal('20')
+    assert alice['original_totals'] == {'EUR': '10.00'}
+    assert bob['original_totals'] == {'JPY': '3000'}
+    assert bob['items'][0]['original_currency'] == 'JPY'
+
+def test_allocation_rounds_to_settlement_minor_unit(provider, monkeypatch):
+    """Test that shares and totals in a zero-decimal currency are whole units"""
+    monkeypatch.setattr(allocation, 'currency_service', CurrencyService(provider))
+
+    response = TestClient(app).post('/api/allocation/calculate', json={
+        'items': [{'id': '1', 'name': 'Ramen', 'quantity': 3, 'price': '1000'}],
+        'people': [{'id': 'a', 'name': 'Alice'}, {'id': 'b', 'name': 'Bob'}],
+        'rules': [],
+        'tax_rate': 0.1,
+        'tip_rate': 0,
+        'grand_total': '3300',
+        'currency': 'JPY',
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    for person in data['allocations']:
+        assert Decimal(person['tax_share']) == Decimal(person['tax_share']).to_integral_value()
+        assert Decimal(person['total']) == Decimal(person['total']).to_integral_value()
+    assert sum(Decimal(p['total']) for p in data['allocations']) == Decimal('3300')
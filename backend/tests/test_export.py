@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import export
+from app.models.schemas import AllocationRequest
+from app.services.bill_store import BillStore
+from app.services.export_service import ExportService
+
+def _bill(total=20):
+    return AllocationRequest(
+        items=[{'id': 'i1', 'name': 'Pizza', 'quantity': 2, 'price': str(total / 2)}],
+        people=[{'id': 'a', 'name': 'Alice'}, {'id': 'b', 'name': 'Bob'}],
+        rules=[],
+        tax_rate=0,
+        tip_rate=0,
+        grand_total=str(total),
+    )
+
+@pytest.fixture
+def store(monkeypatch):
+    store = BillStore()
+    for i in range(10):
+        store.put('trip' if i % 2 else 'home', f'bill-{i}', 'a', _bill())
+    store.delete('home', 'bill-4')
+    monkeypatch.setattr(export, 'export_service', ExportService(store))
+    return store
+
+def test_iter_chunks_resume_and_filters(store):
+    """Test chunked reads, resuming after a seq and filtering by group"""
+    seqs = [b.seq for chunk in store.iter_chunks(chunk_size=3) for b in chunk]
+    assert seqs == [1, 2, 3, 4, 6, 7, 8, 9, 10]
+
+    resumed = [b.seq for chunk in store.iter_chunks(after=6, limit=2) for b in chunk]
+    assert resumed == [7, 8]
+
+    trip = [b.bill_id for chunk in store.iter_chunks(group_id='trip') for b in chunk]
+    assert trip == ['bill-1', 'bill-3', 'bill-5', 'bill-7', 'bill-9']
+
+def test_edit_keeps_seq(store):
+    """Test that editing a bill keeps its position in the export"""
+    bill = store.put('trip', 'bill-1', 'b', _bill(40))
+    assert bill.seq == 2
+    assert bill.paid_by == 'b'
+
+@pytest.mark.parametrize('format', ['csv', 'ndjson', 'parquet'])
+def test_export_formats(store, format):
+    """Test that every format streams one row per person per bill"""
+    if format == 'parquet':
+        pq = pytest.importorskip('pyarrow.parquet')
+    client = TestClient(app)
+    response = client.get(f'/api/export/allocations?format={format}&chunk_size=4')
+    assert response.status_code == 200
+
+    if format == 'csv':
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+    elif format == 'ndjson':
+        rows = [json.loads(line) for line in response.text.splitlines()]
+    else:
+        rows = pq.read_table(io.BytesIO(response.content)).to_pylist()
+
+    assert len(rows) == 18
+    assert {str(r['bill_seq']) for r in rows} == {'1', '2', '3', '4', '6', '7', '8', '9', '10'}
+    assert float(rows[0]['total']) == 10.0
+
+@pytest.mark.parametrize('format', ['csv', 'ndjson', 'parquet'])
+def test_export_reports_failed_bills(store, format):
+    """Test that a bill that cannot be allocated is exported as an error row, not dropped"""
+    if format == 'parquet':
+        pq = pytest.importorskip('pyarrow.parquet')
+    foreign = _bill().model_copy(update={'currency': 'XXX', 'settlement_currency': 'USD'})
+    store.put('trip', 'bill-foreign', 'a', foreign)
+
+    response = TestClient(app).get(f'/api/export/allocations?format={format}&after=9')
+    assert response.status_code == 200
+
+    if format == 'csv':
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+    elif format == 'ndjson':
+        rows = [json.loads(line) for line in response.text.splitlines()]
+    else:
+        rows = pq.read_table(io.BytesIO(response.content)).to_pylist()
+
+    assert [str(r['bill_seq']) for r in rows] == ['10', '10', '11']
+    assert not rows[0]['error']
+    assert rows[2]['bill_id'] == 'bill-foreign'
+    assert 'XXX' in rows[2]['error']
+    assert rows[2]['total'] in ('', None)
+
+def test_export_rejects_unknown_format(store):
+    """Test that unsupported formats are rejected before streaming"""
+    response = TestClient(app).get('/api/export/allocations?format=xlsx')
+    assert response.status_code == 400
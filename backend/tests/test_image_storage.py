@@ -0,0 +1,81 @@
+import io
+import os
+import pytest
+from PIL import Image
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import uploads
+from app.services.image_storage import ImageStorageService
+
+def _jpeg(width=2000, height=600, color=(200, 30, 30)):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    storage = ImageStorageService(root=str(tmp_path), max_bytes=10 * 1024 * 1024)
+    monkeypatch.setattr(uploads, 'image_storage', storage)
+    return storage
+
+def test_save_is_content_addressed(storage):
+    """Test that identical uploads are stored once"""
+    data = _jpeg()
+
+    first = storage.save(data)
+    second = storage.save(data)
+
+    assert first == second
+    assert os.path.exists(storage.path_for(first))
+    assert sum(len(files) for _, _, files in os.walk(storage.root)) == 1
+
+def test_generate_variants(storage):
+    """Test thumbnail and preview generation"""
+    image_hash = storage.save(_jpeg())
+
+    assert storage.generate_variants(image_hash) == ['thumb', 'preview']
+    with Image.open(storage.path_for(image_hash, 'thumb')) as thumb:
+        assert max(thumb.size) == 256
+
+def test_enforce_limit_evicts_oldest(storage):
+    """Test that the oldest images are evicted first, with all their variants"""
+    old = storage.save(_jpeg(color=(1, 2, 3)))
+    storage.generate_variants(old)
+    for path in os.listdir(os.path.dirname(storage.path_for(old))):
+        os.utime(os.path.join(os.path.dirname(storage.path_for(old)), path), (1, 1))
+    new = storage.save(_jpeg(color=(4, 5, 6)))
+    in_flight = os.path.join(os.path.dirname(storage.path_for(old)), 'tmpupload.tmp')
+    with open(in_flight, 'wb') as f:
+        f.write(b'x' * 1024)
+    os.utime(in_flight, (0, 0))
+
+    storage.max_bytes = os.path.getsize(storage.path_for(new))
+    storage.enforce_limit(keep=new)
+
+    assert not os.path.exists(storage.path_for(old))
+    assert not os.path.exists(storage.path_for(old, 'thumb'))
+    assert os.path.exists(storage.path_for(new))
+    assert os.path.exists(in_flight)
+
+def test_serving_headers_and_ranges(storage):
+    """Test immutable caching, ETag revalidation and byte ranges"""
+    data = _jpeg()
+    image_hash = storage.save(data)
+    client = TestClient(app)
+
+    response = client.get(f"/uploads/{image_hash}")
+    assert response.status_code == 200
+    assert response.content == data
+    assert response.headers['content-type'] == 'image/jpeg'
+    assert 'immutable' in response.headers['cache-control']
+
+    etag = response.headers['etag']
+    assert client.get(f"/uploads/{image_hash}", headers={'If-None-Match': etag}).status_code == 304
+
+    partial = client.get(f"/uploads/{image_hash}", headers={'Range': 'bytes=10-19'})
+    assert partial.status_code == 206
+    assert partial.content == data[10:20]
+    assert partial.headers['content-range'] == f"bytes 10-19/{len(data)}"
+
+    assert client.get(f"/uploads/{image_hash}", headers={'Range': 'bytes=999999-'}).status_code == 416
+    assert client.get(f"/uploads/{'0' * 64}").status_code == 404
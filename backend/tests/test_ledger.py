@@ -0,0 +1,92 @@
+from decimal import Decimal
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import allocation, ledger
+from app.services.bill_store import BillStore
+from app.services.currency_service import CurrencyService, RateProvider
+from app.services.ledger_service import LedgerService
+
+def _allocations(**totals):
+    return [{'person_id': p, 'total': t} for p, t in totals.items()]
+
+def test_record_edit_delete_bill():
+    """Test that balances follow bills as they are added, edited and deleted"""
+    service = LedgerService()
+
+    service.record_bill('trip', 'dinner', 'alice', _allocations(alice=30.0, bob=20.0))
+    assert service.get_balance('trip', 'alice') == Decimal('20.00')
+    assert service.get_balance('trip', 'bob') == Decimal('-20.00')
+
+    entry = service.record_bill('trip', 'dinner', 'alice', _allocations(alice=25.0, bob=25.0))
+    assert entry.action == 'edit'
+    assert entry.deltas == {'alice': Decimal('5.00'), 'bob': Decimal('-5.00')}
+    assert service.get_balance('trip', 'bob') == Decimal('-25.00')
+
+    service.delete_bill('trip', 'dinner')
+    assert service.get_balances('trip') == {'alice': Decimal('0.00'), 'bob': Decimal('0.00')}
+    assert service.entry_count('trip') == 3
+
+def test_settlements():
+    """Test that suggested payments settle every balance"""
+    service = LedgerService()
+    service.record_bill('trip', 'hotel', 'alice', _allocations(alice=100.0, bob=100.0, carol=100.0))
+    service.record_bill('trip', 'taxi', 'bob', _allocations(alice=30.0, bob=30.0))
+
+    settlements = service.get_settlements('trip')
+
+    assert sorted(settlements) == [('bob', 'alice', Decimal('70.00')), ('carol', 'alice', Decimal('100.00'))]
+    balances = service.get_balances('trip')
+    for debtor, creditor, amount in settlements:
+        balances[debtor] += amount
+        balances[creditor] -= amount
+    assert all(b == 0 for b in balances.values())
+
+def test_balances_at_replays_from_snapshot():
+    """Test that historical balances match a full replay"""
+    service = LedgerService(snapshot_interval=10)
+    for i in range(35):
+        service.record_bill('trip', f'bill-{i}', 'alice', _allocations(alice=1.0, bob=float(i)))
+
+    ledger = service.groups['trip']
+    assert len(ledger.snapshots) == 3
+    assert ledger.balances_at() == service.get_balances('trip')
+    assert ledger.balances_at(12)['bob'] == -sum(Decimal(i) for i in range(12))
+
+def test_group_has_one_currency():
+    """Test that a group ledger refuses totals in another currency"""
+    service = LedgerService()
+    service.record_bill('trip', 'sushi', 'alice', _allocations(alice=3000, bob=3000), currency='JPY')
+
+    with pytest.raises(ValueError, match='JPY'):
+        service.record_bill('trip', 'pasta', 'bob', _allocations(alice=10, bob=10), currency='EUR')
+    assert service.get_balances('trip') == {'alice': Decimal('3000'), 'bob': Decimal('-3000')}
+
+def test_group_bills_convert_to_group_currency(monkeypatch):
+    """Test that later bills in a group are settled in the first bill's currency"""
+    provider = RateProvider(path='', ttl_seconds=60)
+    provider.load_table({'base': 'USD', 'rates': {'EUR': 0.5, 'JPY': 150.0}})
+    monkeypatch.setattr(allocation, 'currency_service', CurrencyService(provider))
+    monkeypatch.setattr(ledger, 'ledger_service', LedgerService())
+    monkeypatch.setattr(ledger, 'bill_store', BillStore())
+    client = TestClient(app)
+
+    def bill(paid_by, price, currency, **extra):
+        return {'paid_by': paid_by, 'allocation': {
+            'items': [{'id': '1', 'name': 'Dinner', 'quantity': 2, 'price': price}],
+            'people': [{'id': 'a', 'name': 'Alice'}, {'id': 'b', 'name': 'Bob'}],
+            'rules': [], 'tax_rate': 0, 'tip_rate': 0,
+            'grand_total': str(2 * price), 'currency': currency, **extra
+        }}
+
+    assert client.post('/api/groups/trip/bills', json=bill('a', 3000, 'JPY')).status_code == 200
+    response = client.post('/api/groups/trip/bills', json=bill('b', 10, 'EUR'))
+    assert response.status_code == 200
+    assert response.json()['allocation']['currency'] == 'JPY'
+
+    balances = client.get('/api/groups/trip/balances').json()
+    assert balances['currency'] == 'JPY'
+    assert {p: Decimal(b) for p, b in balances['balances'].items()} == {'a': Decimal('0'), 'b': Decimal('0')}
+
+    rejected = client.post('/api/groups/trip/bills', json=bill('a', 10, 'EUR', settlement_currency='EUR'))
+    assert rejected.status_code == 400
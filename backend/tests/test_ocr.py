@@ -1,4 +1,8 @@
+import io
+import json
+import threading
 import pytest
+from PIL import Image
 from app.services.ocr_service import OCRService
 
 @pytest.fixture
@@ -41,3 +45,97 @@ def test_parse_receipt_text_with_skip_words():
     assert len(items) == 1
     assert items[0]['name'] == 'Chapati'
     # Total, Tax, Tip should be skipped
+
+def _receipt_image(width, height):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), 'white').save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+def test_split_into_tiles():
+    """Test that only tall receipts are split into overlapping tiles"""
+    service = OCRService()
+
+    assert len(service._split_into_tiles(_receipt_image(800, 1200))) == 1
+
+    tiles = service._split_into_tiles(_receipt_image(400, 4000))
+    assert 2 <= len(tiles) <= 8
+    heights = [Image.open(io.BytesIO(t)).size[1] for t in tiles]
+    assert len(set(heights)) == 1
+    assert heights[0] * len(tiles) > 4000  # tiles overlap
+
+def test_merge_tile_items_drops_overlap():
+    """Test that items read twice in a tile overlap are kept once"""
+    service = OCRService()
+    naan = {'name': 'Naan', 'quantity': 1, 'price': 3.0}
+    tiles = [
+        [{'name': 'Dal', 'quantity': 1, 'price': 9.0}, naan, naan],
+        [naan, {'name': 'Rice', 'quantity': 1, 'price': 4.0}],
+        [{'name': 'Lassi', 'quantity': 2, 'price': 4.5}],
+    ]
+
+    merged = service._merge_tile_items(tiles)
+
+    assert [i['name'] for i in merged] == ['Dal', 'Naan', 'Naan', 'Rice', 'Lassi']
+
+def _tiled_service(responses):
+    """OCR service whose vision model answers each tile with a canned response"""
+    service = OCRService()
+    service.openai_client = object()
+    # Every tile must be in flight at once to get past the barrier
+    barrier = threading.Barrier(len(responses), timeout=5)
+
+    def fake_call(image_data, prompt):
+        barrier.wait()
+        return json.dumps(responses[image_data])
+
+    service._call_vision_model = fake_call
+    service._split_into_tiles = lambda data: list(responses)
+    return service
+
+@pytest.mark.asyncio
+async def test_tiled_extraction_checks_printed_subtotal():
+    """Test concurrent tile OCR, merging and the subtotal check"""
+    service = _tiled_service({
+        b'tile-1': {'items': [{'name': 'Dal', 'quantity': 1, 'price': 9.0}], 'subtotal': None, 'total': None},
+        b'tile-2': {'items': [{'name': 'Dal', 'quantity': 1, 'price': 9.0}, {'name': 'Rice', 'quantity': 1, 'price': 4.0}],
+                    'subtotal': 13.0, 'total': 14.04},
+    })
+
+    result = await service._extract_with_vision_model(b'image')
+
+    assert [i['name'] for i in result['items']] == ['Dal', 'Rice']
+    assert result['confidence'] == 0.95
+
+@pytest.mark.asyncio
+async def test_tiled_extraction_tolerates_malformed_tiles():
+    """Test that non-numeric amounts from a tile are coerced or dropped instead of failing the upload"""
+    service = _tiled_service({
+        b'tile-1': {'items': [{'name': 'Dal', 'quantity': '1', 'price': '$9.00'},
+                              {'name': 'Rice', 'quantity': None, 'price': 'N/A'}, 'Lassi'],
+                    'subtotal': 'N/A', 'total': None},
+        b'tile-2': {'items': [{'name': 'Naan', 'quantity': 'two', 'price': 3}], 'subtotal': '$12.00', 'total': 'N/A'},
+    })
+
+    result = await service._extract_with_vision_model(b'image')
+
+    assert [(i['name'], i['quantity'], i['price']) for i in result['items']] == [('Dal', 1, 9.0), ('Naan', 1, 3.0)]
+    assert result['confidence'] == 0.95
+
+@pytest.mark.asyncio
+async def test_tiling_runs_off_the_event_loop():
+    """Test that splitting a receipt into tiles does not block the event loop"""
+    service = OCRService()
+    service.openai_client = object()
+    loop_thread = threading.get_ident()
+    tiling_threads = []
+
+    def split(image_data):
+        tiling_threads.append(threading.get_ident())
+        return [image_data]
+
+    service._split_into_tiles = split
+    service._call_vision_model = lambda image_data, prompt: '[]'
+
+    await service._extract_with_vision_model(b'image')
+
+    assert tiling_threads and tiling_threads[0] != loop_thread
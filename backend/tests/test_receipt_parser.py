@@ -0,0 +1,117 @@
+import pytest
+from app.services.receipt_parser import parse_receipt_text, parse_receipt_items
+
+# Accuracy corpus: real-world receipt layouts and the items expected from them
+RECEIPT_CORPUS = [
+    (
+        "name and price on separate lines",
+        """
+        GREAT VALUE MILK
+        3.48 F
+        BANANAS
+        1.24 N
+        SUBTOTAL
+        4.72
+        """,
+        [('GREAT VALUE MILK', 1, 3.48, True), ('BANANAS', 1, 1.24, False)],
+    ),
+    (
+        "same-line prices with tax flags",
+        """
+        Paneer Tikka    $12.99 T
+        Garlic Naan     $3.50
+        Subtotal        $16.49
+        Tax              $1.32
+        """,
+        [('Paneer Tikka', 1, 12.99, True), ('Garlic Naan', 1, 3.50, True)],
+    ),
+    (
+        "quantity lines after the item name",
+        """
+        COKE ZERO 12PK
+        2 @ 6.49     12.98 F
+        CHIPS
+        3 x 2.00
+        """,
+        [('COKE ZERO 12PK', 2, 6.49, True), ('CHIPS', 3, 2.00, True)],
+    ),
+    (
+        "inline and leading quantities",
+        """
+        Mango Lassi 2 x 4.50
+        2x Butter Chicken 31.98
+        Chapati    5  $2.50
+        """,
+        [('Mango Lassi', 2, 4.50, True), ('Butter Chicken', 2, 15.99, True), ('Chapati', 5, 2.50, True)],
+    ),
+    (
+        "duplicates at the same and different prices",
+        """
+        Samosa 3.00
+        Samosa 3.00
+        Samosa 2 x 2.50
+        """,
+        [('Samosa', 2, 3.00, True), ('Samosa', 2, 2.50, True)],
+    ),
+    (
+        "item names containing skip words",
+        """
+        Border Collie Toy 5.00
+        Gluten Free Bread 4.99
+        Tax-free item 4.00
+        Cardamom Tea 2.50
+        Sub-total 16.49
+        Tax 0.83
+        Order #1234
+        """,
+        [('Border Collie Toy', 1, 5.00, True), ('Gluten Free Bread', 1, 4.99, True),
+         ('Tax-free item', 1, 4.00, True), ('Cardamom Tea', 1, 2.50, True)],
+    ),
+    (
+        "pack sizes and numbers in item names",
+        """
+        Eggs 12 3.99
+        Box of 6 4.99
+        Water 24 PK 5.49 F
+        Chapati    5  $2.50
+        Subtotal 26.97
+        Visa 1234 26.97
+        """,
+        [('Eggs 12', 1, 3.99, True), ('Box of 6', 1, 4.99, True), ('Water 24 PK', 1, 5.49, True),
+         ('Chapati', 5, 2.50, True)],
+    ),
+]
+
+
+@pytest.mark.parametrize("layout,text,expected", RECEIPT_CORPUS, ids=[c[0] for c in RECEIPT_CORPUS])
+def test_receipt_corpus(layout, text, expected):
+    """Test that each corpus layout parses to the expected items"""
+    items = parse_receipt_items(text)
+
+    assert [(i['name'], i['quantity'], i['price'], i['is_taxable']) for i in items] == expected
+
+
+def test_subtotal_cross_check():
+    """Test that the summed items are checked against the printed subtotal"""
+    result = parse_receipt_text("""
+    Chapati    5  $2.50
+    Rice    1  $3.99
+    Subtotal: $16.49
+    Total: $17.81
+    """)
+
+    assert result['items_total'] == 16.49
+    assert result['subtotal'] == 16.49
+    assert result['total'] == 17.81
+    assert result['subtotal_matches'] is True
+
+    result = parse_receipt_text("Rice 3.99\nSubtotal 5.99")
+    assert result['subtotal_matches'] is False
+
+
+def test_subtotal_missing():
+    """Test that the cross-check is skipped without a printed subtotal"""
+    result = parse_receipt_text("Rice 3.99")
+
+    assert result['subtotal'] is None
+    assert result['subtotal_matches'] is None
@@ -0,0 +1,55 @@
+import msgpack
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.compression import negotiate_encoding
+
+def _request(items=60, people=10):
+    return {
+        'items': [{'id': str(i), 'name': f'Item {i}', 'quantity': people, 'price': '2.50'} for i in range(items)],
+        'people': [{'id': f'p{i}', 'name': f'Person {i}'} for i in range(people)],
+        'rules': [],
+        'tax_rate': 0,
+        'tip_rate': 0,
+        'grand_total': str(items * people * 2.5),
+    }
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+def test_negotiate_encoding():
+    """Test Accept-Encoding negotiation with q-values"""
+    assert negotiate_encoding('gzip, deflate, br', ['br', 'gzip']) == 'br'
+    assert negotiate_encoding('br;q=0.5, gzip', ['br', 'gzip']) == 'gzip'
+    assert negotiate_encoding('identity', ['br', 'gzip']) is None
+    assert negotiate_encoding('*', ['br', 'gzip']) == 'br'
+
+def test_large_response_is_compressed(client):
+    """Test that large JSON responses are compressed and small ones are not"""
+    response = client.post('/api/allocation/calculate', json=_request(), headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['vary']
+    assert len(response.json()['allocations']) == 10
+
+    small = client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in small.headers
+
+def test_msgpack_and_columnar(client):
+    """Test MessagePack and columnar encodings carry the same result"""
+    rows = client.post('/api/allocation/calculate', json=_request()).json()
+
+    packed = client.post('/api/allocation/calculate', json=_request(), headers={'Accept': 'application/msgpack'})
+    assert packed.headers['content-type'] == 'application/msgpack'
+    assert msgpack.unpackb(packed.content) == rows
+
+    columnar = client.post('/api/allocation/calculate?shape=columnar', json=_request()).json()
+    assert len(columnar['items']['item_id']) == 60
+    assert len(columnar['shares']['item']) == sum(len(a['items']) for a in rows['allocations'])
+    assert columnar['people']['total'] == [a['total'] for a in rows['allocations']]
+    assert columnar['total_calculated'] == rows['total_calculated']
+
+def test_unknown_format(client):
+    """Test that unsupported encodings are rejected"""
+    response = client.post('/api/allocation/calculate?format=xml', json=_request())
+    assert response.status_code == 400
@@ -42,6 +42,10 @@ export interface OCRResponse {
     price: number;
     is_taxable: boolean;
   }>;
+  image_hash?: string;
+  image_url?: string;
+  thumbnail_url?: string;
+  preview_url?: string;
 }
 
 export interface AllocationRequest {